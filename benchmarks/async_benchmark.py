@@ -0,0 +1,137 @@
+"""
+Compare request latency of the sync DBManager and the AsyncDBManager under
+concurrent load. Every request reads the time series of several exercises.
+The sync path serves the requests from a thread pool, like a threaded WSGI
+server, while the async path serves them from a single event loop and
+gathers the reads of every request concurrently.
+
+Usage:
+    python benchmarks/async_benchmark.py --requests 50 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from exercise_plotter import Session
+from exercise_plotter.backend.async_database_manager import (
+    AsyncDBManager,
+    AsyncSession,
+    async_session_scope,
+)
+from exercise_plotter.backend.database_manager import Base, DBManager, session_scope
+
+
+def populate(n_exercises: int, n_samples: int) -> list:
+    exercise_ids = []
+    with session_scope() as session:
+        db_man = DBManager(session)
+        for number in range(n_exercises):
+            meta = {
+                "timestamp": datetime.datetime(2020, 1, 1) + datetime.timedelta(number)
+            }
+            data = pd.DataFrame(
+                {
+                    "time": np.arange(n_samples, dtype=float),
+                    "heart_rate": np.full(n_samples, 140),
+                    "speed": np.linspace(2, 4, n_samples),
+                }
+            )
+            exercise_ids.append(db_man.add_exercise(meta, data))
+    return exercise_ids
+
+
+def run_sync(requests: list, concurrency: int) -> list:
+    def handle(exercise_ids):
+        start = time.perf_counter()
+        with session_scope() as session:
+            db_man = DBManager(session)
+            for exercise_id in exercise_ids:
+                db_man.get_excercise_time_series_values(
+                    exercise_id, column_names=["time", "speed"]
+                )
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(handle, requests))
+
+
+async def run_async(requests: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(exercise_ids):
+        async with semaphore:
+            start = time.perf_counter()
+            async with async_session_scope() as session:
+                await AsyncDBManager(session).get_excercise_time_series_values_many(
+                    exercise_ids, column_names=["time", "speed"]
+                )
+            return time.perf_counter() - start
+
+    return list(await asyncio.gather(*[handle(request) for request in requests]))
+
+
+def summary(mode: str, latencies: list, total: float) -> dict:
+    return {
+        "mode": mode,
+        "mean latency [ms]": 1000 * np.mean(latencies),
+        "p95 latency [ms]": 1000 * np.percentile(latencies, 95),
+        "throughput [requests/s]": len(latencies) / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--exercises", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=3600)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--exercises-per-request", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.db")
+        engine = create_engine("sqlite:///{}".format(path))
+        Session.configure(bind=engine)
+        Base.metadata.create_all(engine)
+        exercise_ids = populate(args.exercises, args.samples)
+
+        rng = np.random.default_rng(0)
+        requests = [
+            [int(e_id) for e_id in rng.choice(exercise_ids, args.exercises_per_request)]
+            for _ in range(args.requests)
+        ]
+
+        start = time.perf_counter()
+        sync_latencies = run_sync(requests, args.concurrency)
+        sync_total = time.perf_counter() - start
+
+        async_engine = create_async_engine("sqlite+aiosqlite:///{}".format(path))
+        AsyncSession.configure(bind=async_engine)
+        start = time.perf_counter()
+        async_latencies = asyncio.run(run_async(requests, args.concurrency))
+        async_total = time.perf_counter() - start
+
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+
+    results = pd.DataFrame(
+        [
+            summary("sync", sync_latencies, sync_total),
+            summary("async", async_latencies, async_total),
+        ]
+    )
+    print(results.set_index("mode").to_string(float_format="{:,.1f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compare the row based and the compressed storage of time series with respect
+to database size and read throughput.
+
+Usage:
+    python benchmarks/compression_benchmark.py --exercises 20 --samples 10800
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from exercise_plotter import Session
+from exercise_plotter.backend.database_manager import Base, DBManager, session_scope
+
+
+def synthetic_exercise(n_samples: int, seed: int) -> pd.DataFrame:
+    """A 1 Hz exercise with slowly varying values, similar to a watch export"""
+    rng = np.random.default_rng(seed)
+    speed = np.clip(3.0 + np.cumsum(rng.normal(0, 0.02, n_samples)), 0, None)
+    return pd.DataFrame(
+        {
+            "time": np.arange(n_samples, dtype=float),
+            "heart_rate": np.round(
+                140 + np.cumsum(rng.normal(0, 0.3, n_samples))
+            ).astype(int),
+            "speed": np.round(speed, 3),
+            "altitude": np.round(100 + np.cumsum(rng.normal(0, 0.1, n_samples)), 1),
+            "distance": np.round(np.cumsum(speed), 2),
+            "latitude": np.round(60 + np.cumsum(rng.normal(0, 1e-5, n_samples)), 7),
+            "longitude": np.round(10 + np.cumsum(rng.normal(0, 1e-5, n_samples)), 7),
+        }
+    )
+
+
+def run(n_exercises: int, n_samples: int, compressed: bool) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.db")
+        engine = create_engine("sqlite:///{}".format(path))
+        Session.configure(bind=engine)
+        Base.metadata.create_all(engine)
+
+        exercise_ids = []
+        with session_scope() as session:
+            db_man = DBManager(session, compressed=compressed)
+            for number in range(n_exercises):
+                meta = {
+                    "timestamp": datetime.datetime(2020, 1, 1)
+                    + datetime.timedelta(number)
+                }
+                exercise_ids.append(
+                    db_man.add_exercise(meta, synthetic_exercise(n_samples, number))
+                )
+
+        with session_scope() as session:
+            db_man = DBManager(session)
+            start = time.perf_counter()
+            for exercise_id in exercise_ids:
+                db_man.get_excercise_time_series_values(exercise_id)
+            all_columns = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for exercise_id in exercise_ids:
+                db_man.get_excercise_time_series_values(
+                    exercise_id, column_names=["time", "heart_rate"]
+                )
+            two_columns = time.perf_counter() - start
+
+        engine.dispose()
+        size = os.path.getsize(path)
+
+    n_total = n_exercises * n_samples
+    return {
+        "mode": "compressed" if compressed else "rows",
+        "size [MB]": size / 2**20,
+        "bytes/sample": size / n_total,
+        "read all [samples/s]": n_total / all_columns,
+        "read 2 columns [samples/s]": n_total / two_columns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--exercises", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=3 * 3600)
+    args = parser.parse_args()
+
+    results = pd.DataFrame(
+        [run(args.exercises, args.samples, compressed) for compressed in (False, True)]
+    )
+    print(results.set_index("mode").to_string(float_format="{:,.2f}".format))
+
+
+if __name__ == "__main__":
+    main()
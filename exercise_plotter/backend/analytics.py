@@ -0,0 +1,234 @@
+"""
+Analytics computed from the time series of the exercises: rolling averages,
+mean maximal curves (best average value over every window length) and heart
+rate zone distributions. All computations are vectorized with NumPy, using
+prefix sums such that every window length costs O(n).
+
+Mean maximal curves are persisted through the DBManager, such that they can
+be plotted without reading the time series.
+
+Usage:
+    from exercise_plotter.backend.analytics import update_mean_max_curves
+
+    with session_scope() as session:
+        db_man = DBManager(session)
+        update_mean_max_curves(db_man)
+        curves = db_man.get_mean_max_curves("speed")
+"""
+
+from typing import Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Window lengths (in seconds) of the mean maximal curves
+DEFAULT_DURATIONS = np.array(
+    [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 1200, 1800, 3600]
+    + [5400, 7200, 10800, 14400]
+)
+
+MEAN_MAX_COLUMNS = ("speed", "heart_rate")
+
+# Number of exercises whose time series are held in memory at once when
+# updating the mean maximal curves
+MEAN_MAX_BATCH_SIZE = 64
+
+# Lower boundaries of the heart rate zones, as fraction of the max heart rate
+HEART_RATE_ZONES = (0.5, 0.6, 0.7, 0.8, 0.9)
+
+# Sample interval (in seconds) the time series are resampled to
+SAMPLE_INTERVAL = 1.0
+
+
+def resample(time: np.ndarray, values: np.ndarray, step: float = SAMPLE_INTERVAL):
+    """Linearly interpolate a time series onto a uniform time grid starting at
+    the first sample. Missing values are interpolated over.
+
+    Returns:
+        np.ndarray -- The values at the times time[0], time[0] + step, ...
+    """
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return np.zeros(0)
+
+    time, values = time[valid], values[valid]
+    grid = np.arange(time[0], time[-1] + step / 2, step)
+    return np.interp(grid, time, values)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of every window of window consecutive values
+
+    Returns:
+        np.ndarray -- len(values) - window + 1 means, the first being the
+                      mean of values[:window]
+    """
+    prefix = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+    return (prefix[window:] - prefix[:-window]) / window
+
+
+def mean_max_curves(
+    series: Sequence[np.ndarray],  # pylint: disable=bad-continuation
+    durations: Iterable[int] = DEFAULT_DURATIONS,  # pylint: disable=bad-continuation
+) -> np.ndarray:  # pylint: disable=bad-continuation
+    """Compute the best average value over every window length in durations
+    for a batch of uniformly sampled series (see resample). The series are
+    padded into one matrix, such that every window length is a single
+    vectorized operation over all series.
+
+    Arguments:
+        series {Sequence[np.ndarray]} -- Uniformly sampled series
+
+    Keyword Arguments:
+        durations {Iterable[int]} -- Window lengths, in number of samples
+        (default: {DEFAULT_DURATIONS})
+
+    Returns:
+        np.ndarray -- Array of shape (len(series), len(durations)). NaN where
+                      the series is shorter than the window
+    """
+    durations = np.asarray(list(durations), dtype=int)
+    lengths = np.array([len(values) for values in series], dtype=int)
+    curves = np.full((len(series), len(durations)), np.nan)
+
+    if len(series) == 0 or lengths.max() == 0:
+        return curves
+
+    padded = np.zeros((len(series), lengths.max()))
+    for row, values in enumerate(series):
+        padded[row, : len(values)] = values
+
+    prefix = np.concatenate(
+        (np.zeros((len(series), 1)), np.cumsum(padded, axis=1)), axis=1
+    )
+
+    for column, duration in enumerate(durations):
+        if duration > lengths.max():
+            continue
+        means = (prefix[:, duration:] - prefix[:, :-duration]) / duration
+
+        # Windows reaching into the padding are not valid
+        starts = np.arange(means.shape[1])
+        means[starts[np.newaxis, :] > (lengths - duration)[:, np.newaxis]] = -np.inf
+
+        best = means.max(axis=1)
+        curves[:, column] = np.where(np.isinf(best), np.nan, best)
+
+    return curves
+
+
+def heart_rate_zone_distribution(
+    time: np.ndarray,  # pylint: disable=bad-continuation
+    heart_rate: np.ndarray,  # pylint: disable=bad-continuation
+    max_heart_rate: float,  # pylint: disable=bad-continuation
+    zones: Sequence[float] = HEART_RATE_ZONES,  # pylint: disable=bad-continuation
+) -> np.ndarray:  # pylint: disable=bad-continuation
+    """Time spent in every heart rate zone. Every sample is weighted with the
+    time until the next sample.
+
+    Returns:
+        np.ndarray -- Seconds spent in each zone. The first entry is the time
+                      below the first zone, the last is the time in the top zone
+    """
+    time = np.asarray(time, dtype=float)
+    heart_rate = np.asarray(heart_rate, dtype=float)
+
+    weights = np.diff(time, append=time[-1:])
+    valid = ~np.isnan(heart_rate)
+
+    zone = np.searchsorted(
+        np.asarray(zones) * max_heart_rate, heart_rate[valid], side="right"
+    )
+    return np.bincount(zone, weights=weights[valid], minlength=len(zones) + 1)
+
+
+def _compute_mean_max_curves(
+    db_man,  # pylint: disable=bad-continuation
+    exercise_ids: List[int],  # pylint: disable=bad-continuation
+    columns: Sequence[str],  # pylint: disable=bad-continuation
+    durations: np.ndarray,  # pylint: disable=bad-continuation
+) -> pd.DataFrame:  # pylint: disable=bad-continuation
+    """The mean maximal curves of the given exercises, in the format of
+    DBManager.add_mean_max_curves
+    """
+    series = {
+        exercise_id: db_man.get_excercise_time_series_values(
+            exercise_id=int(exercise_id), column_names=["time"] + list(columns)
+        )
+        for exercise_id in exercise_ids
+    }
+
+    curves = []
+    for column_name in columns:
+        values = mean_max_curves(
+            [
+                resample(
+                    data["time"].to_numpy(),
+                    data[column_name].to_numpy(dtype=float, na_value=np.nan),
+                )
+                for data in series.values()
+            ],
+            durations=(durations / SAMPLE_INTERVAL).astype(int),
+        )
+        curves.append(
+            pd.DataFrame(
+                {
+                    "exercise_id": np.repeat(list(series), len(durations)),
+                    "column_name": column_name,
+                    "duration": np.tile(durations, len(series)).astype(float),
+                    "value": values.ravel(),
+                }
+            )
+        )
+
+    return pd.concat(curves, ignore_index=True).dropna(subset=["value"])
+
+
+def update_mean_max_curves(
+    db_man,  # pylint: disable=bad-continuation
+    exercise_ids: List[int] = None,  # pylint: disable=bad-continuation
+    columns: Sequence[str] = MEAN_MAX_COLUMNS,  # pylint: disable=bad-continuation
+    durations: Iterable[int] = DEFAULT_DURATIONS,  # pylint: disable=bad-continuation
+    batch_size: int = MEAN_MAX_BATCH_SIZE,  # pylint: disable=bad-continuation
+) -> pd.DataFrame:  # pylint: disable=bad-continuation
+    """Compute the mean maximal curves of the given exercises and store them
+    in the database. The exercises are processed in batches, such that only
+    the time series of one batch are held in memory.
+
+    Arguments:
+        db_man {DBManager} -- Manager used to read the series and store the curves
+
+    Keyword Arguments:
+        exercise_ids {List[int]} -- Exercises to compute the curves for. All
+        exercises by default. (default: {None})
+        columns {Sequence[str]} -- Columns to compute the curves for
+        (default: {MEAN_MAX_COLUMNS})
+        durations {Iterable[int]} -- Window lengths in seconds
+        (default: {DEFAULT_DURATIONS})
+        batch_size {int} -- Number of exercises per batch
+        (default: {MEAN_MAX_BATCH_SIZE})
+
+    Returns:
+        pd.DataFrame -- The stored curves, with the columns exercise_id,
+                        column_name, duration and value
+    """
+    if exercise_ids is None:
+        exercise_ids = db_man.get_exercise_overview()["id"].tolist()
+
+    durations = np.asarray(list(durations), dtype=int)
+
+    curves = []
+    for start in range(0, len(exercise_ids), batch_size):
+        batch = _compute_mean_max_curves(
+            db_man, exercise_ids[start : start + batch_size], columns, durations
+        )
+        db_man.add_mean_max_curves(batch)
+        curves.append(batch)
+
+    if not curves:
+        return pd.DataFrame(columns=["exercise_id", "column_name", "duration", "value"])
+
+    return pd.concat(curves, ignore_index=True)
@@ -0,0 +1,260 @@
+"""
+Asynchronous counterpart of the DBManager, using the asyncio extension of
+SQLAlchemy. Requires SQLAlchemy >= 1.4 and an async driver such as aiosqlite,
+which are installed with the "async" extra.
+
+The queries themselves are shared with the DBManager, and are run through
+AsyncSession.run_sync such that the two never diverge.
+
+Usage:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from exercise_plotter.backend.async_database_manager import (
+        AsyncDBManager,
+        AsyncSession,
+        async_session_scope,
+    )
+
+    engine = create_async_engine("sqlite+aiosqlite:///example.db")
+    AsyncSession.configure(bind=engine)
+
+    async with async_session_scope() as session:
+        db = AsyncDBManager(session)
+        frames = await db.get_excercise_time_series_values_many([1, 2, 3])
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple, Union
+
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession as _AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from exercise_plotter.backend.compression import CHUNK_SIZE
+from exercise_plotter.backend.database_manager import DBManager, _column_list
+
+# Configured with an async engine by the application, like the global Session
+AsyncSession = sessionmaker(  # pylint: disable=invalid-name
+    class_=_AsyncSession, expire_on_commit=False
+)
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Provide a transactional scope around a series of async operations."""
+    session = AsyncSession()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+class AsyncDBManager:
+    """
+    Asynchronous DataBase manager for the Exercise Plotter. Provides the same
+    methods as the DBManager, see the DBManager for documentation.
+
+    An AsyncSession can not run several operations at the same time. Reads
+    that should run concurrently, like get_excercise_time_series_values_many,
+    therefore open a separate session per read.
+
+    The lazy query builder of DBManager.exercises has no async counterpart,
+    as its methods are chained before the query is run. Run the finished
+    query on the sync view of the session instead:
+
+        frame = await session.run_sync(
+            lambda sync_session: DBManager(sync_session)
+            .exercises()
+            .where(distance=(10, None))
+            .to_frame()
+        )
+
+    Usage:
+        from exercise_plotter.backend.async_database_manager import (
+            AsyncDBManager,
+            async_session_scope,
+        )
+
+        async with async_session_scope() as session:
+            db = AsyncDBManager(session)
+            await db.add_exercise(meta, data)
+    """
+
+    def __init__(self, session, compressed: bool = False):
+        self.session = session
+        self.compressed = compressed
+
+    async def _run_sync(self, method: str, *args, session=None, **kwargs):
+        """Run a method of the DBManager on the sync view of the session"""
+
+        def call(sync_session):
+            db_man = DBManager(sync_session, compressed=self.compressed)
+            return getattr(db_man, method)(*args, **kwargs)
+
+        return await (session or self.session).run_sync(call)
+
+    async def get_excercise_time_series_values(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: int,  # pylint: disable=bad-continuation
+        column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        return await self._run_sync(
+            "get_excercise_time_series_values", exercise_id, column_names
+        )
+
+    async def get_excercise_time_series_values_many(
+        self,  # pylint: disable=bad-continuation
+        exercise_ids: List[int],  # pylint: disable=bad-continuation
+        column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    ) -> List[pd.DataFrame]:  # pylint: disable=bad-continuation
+        """Get the time series of several exercises concurrently
+
+        Arguments:
+            exercise_ids {List[int]} -- The ids of the exercises
+
+        Keyword Arguments:
+            column_names {Union[str, List]} -- column names to provide.
+            All will be given by default. (default: {'*'})
+
+        Returns:
+            List[pd.DataFrame] -- The time series, in the order of exercise_ids
+        """
+
+        async def read(exercise_id):
+            async with _AsyncSession(bind=self.session.bind) as session:
+                return await self._run_sync(
+                    "get_excercise_time_series_values",
+                    int(exercise_id),
+                    column_names,
+                    session=session,
+                )
+
+        return list(await asyncio.gather(*[read(e_id) for e_id in exercise_ids]))
+
+    async def get_excercise_time_series_window(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: int,  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        return await self._run_sync(
+            "get_excercise_time_series_window",
+            exercise_id,
+            start_time=start_time,
+            end_time=end_time,
+            column_names=column_names,
+        )
+
+    async def get_excercise_time_series_page(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: int,  # pylint: disable=bad-continuation
+        limit: int,  # pylint: disable=bad-continuation
+        after_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        return await self._run_sync(
+            "get_excercise_time_series_page",
+            exercise_id,
+            limit,
+            after_time=after_time,
+            column_names=column_names,
+        )
+
+    async def iter_excercise_time_series(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: int,  # pylint: disable=bad-continuation
+        chunk_size: int = CHUNK_SIZE,  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    ) -> AsyncIterator[pd.DataFrame]:  # pylint: disable=bad-continuation
+        """Asynchronous version of DBManager.iter_excercise_time_series.
+        Every chunk is read with a separate page query.
+        """
+        column_names = _column_list(column_names)
+        drop_time = column_names != ["*"] and "time" not in column_names
+        query_columns = column_names + ["time"] if drop_time else column_names
+
+        after_time = None
+        while True:
+            chunk = await self._run_sync(
+                "_get_time_series_range",
+                exercise_id,
+                query_columns,
+                start_time=start_time,
+                end_time=end_time,
+                after_time=after_time,
+                limit=chunk_size,
+            )
+            if chunk.empty:
+                return
+
+            after_time = chunk["time"].iloc[-1]
+            yield chunk.drop("time", axis=1) if drop_time else chunk
+
+            if len(chunk) < chunk_size:
+                return
+
+    async def get_exercise_overview(self, include_notes: bool = False) -> pd.DataFrame:
+        return await self._run_sync("get_exercise_overview", include_notes)
+
+    async def get_exercise_notes(self, exercise_ids: List[int] = None) -> pd.Series:
+        return await self._run_sync("get_exercise_notes", exercise_ids)
+
+    async def get_data_version(self) -> int:
+        return await self._run_sync("get_data_version")
+
+    async def get_mean_max_curves(
+        self, column_name: str, exercise_ids: List[int] = None
+    ) -> pd.DataFrame:
+        return await self._run_sync(
+            "get_mean_max_curves", column_name, exercise_ids=exercise_ids
+        )
+
+    async def get_exercises_in_bounding_box(
+        self,  # pylint: disable=bad-continuation
+        min_latitude: float,  # pylint: disable=bad-continuation
+        min_longitude: float,  # pylint: disable=bad-continuation
+        max_latitude: float,  # pylint: disable=bad-continuation
+        max_longitude: float,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        return await self._run_sync(
+            "get_exercises_in_bounding_box",
+            min_latitude,
+            min_longitude,
+            max_latitude,
+            max_longitude,
+        )
+
+    async def get_segment_passes(
+        self,  # pylint: disable=bad-continuation
+        start: Tuple[float, float],  # pylint: disable=bad-continuation
+        end: Tuple[float, float],  # pylint: disable=bad-continuation
+        **kwargs  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        return await self._run_sync("get_segment_passes", start, end, **kwargs)
+
+    async def add_exercise(self, meta: Dict, data: pd.DataFrame = None) -> int:
+        return await self._run_sync("add_exercise", meta, data)
+
+    async def add_timeseries(self, exercise_id: int, data: pd.DataFrame):
+        return await self._run_sync("add_timeseries", exercise_id, data)
+
+    async def add_mean_max_curves(self, curves: pd.DataFrame):
+        return await self._run_sync("add_mean_max_curves", curves)
+
+    async def get_exercise_id_by_file_hash(self, file_hash: str) -> Union[int, None]:
+        return await self._run_sync("get_exercise_id_by_file_hash", file_hash)
+
+    async def sync_exercise(
+        self,  # pylint: disable=bad-continuation
+        meta: Dict,  # pylint: disable=bad-continuation
+        data: pd.DataFrame,  # pylint: disable=bad-continuation
+        file_hash: str = None,  # pylint: disable=bad-continuation
+    ) -> int:  # pylint: disable=bad-continuation
+        return await self._run_sync("sync_exercise", meta, data, file_hash=file_hash)
@@ -0,0 +1,134 @@
+"""
+Compact encoding of time series columns, used by the compressed storage mode
+of the DBManager. Every column is stored in chunks of CHUNK_SIZE samples.
+The values in a chunk are converted to fixed point integers, delta encoded,
+zigzag encoded and finally written as variable length integers (varint).
+Missing values are left out of the value stream and tracked in a bit mask.
+
+Usage:
+    from exercise_plotter.backend.compression import encode_column, decode_column
+
+    data, null_mask = encode_column(values, scale=100)
+    values = decode_column(data, null_mask, len(values), scale=100)
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 4096
+
+# Number of fixed point steps per unit for every column, i.e. the precision
+# the values are stored with. Columns not listed here use DEFAULT_SCALE.
+COLUMN_SCALES = {
+    "time": 1000,
+    "heart_rate": 1,
+    "speed": 1000,
+    "altitude": 100,
+    "distance": 100,
+    "latitude": 10**7,
+    "longitude": 10**7,
+}
+DEFAULT_SCALE = 1000
+
+# A 64 bit integer needs at most 10 groups of 7 bits
+_MAX_VARINT_BYTES = 10
+
+
+def column_scale(column_name: str) -> int:
+    return COLUMN_SCALES.get(column_name, DEFAULT_SCALE)
+
+
+def zigzag_encode(values: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned integers such that values with a small
+    magnitude get a small code: 0, -1, 1, -2, 2 -> 0, 1, 2, 3, 4
+    """
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def zigzag_decode(values: np.ndarray) -> np.ndarray:
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).astype(np.int64)) ^ -(
+        (values & np.uint64(1)).astype(np.int64)
+    )
+
+
+def varint_encode(values: np.ndarray) -> bytes:
+    """Encode unsigned integers using 7 bits per byte, with the highest bit
+    set on all but the last byte of every value.
+    """
+    values = values.astype(np.uint64)
+    shifts = np.arange(_MAX_VARINT_BYTES, dtype=np.uint64) * np.uint64(7)
+    groups = (values[:, np.newaxis] >> shifts) & np.uint64(0x7F)
+
+    n_bytes = 1 + np.count_nonzero(values[:, np.newaxis] >> shifts[1:], axis=1)
+    positions = np.arange(_MAX_VARINT_BYTES)
+    continuation = positions < (n_bytes - 1)[:, np.newaxis]
+
+    encoded = groups | (continuation.astype(np.uint64) << np.uint64(7))
+    return encoded[positions < n_bytes[:, np.newaxis]].astype(np.uint8).tobytes()
+
+
+def varint_decode(buffer: bytes) -> np.ndarray:
+    encoded = np.frombuffer(buffer, dtype=np.uint8)
+    if encoded.size == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    ends = np.flatnonzero(encoded < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+
+    value_index = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    positions = np.arange(encoded.size) - starts[value_index]
+
+    parts = (encoded & 0x7F).astype(np.uint64) << (positions.astype(np.uint64) * 7)
+    return np.add.reduceat(parts, starts)
+
+
+def encode_column(values: np.ndarray, scale: int) -> Tuple[bytes, Optional[bytes]]:
+    """Encode a chunk of a column.
+
+    Arguments:
+        values {np.ndarray} -- The values of the chunk, NaN for missing values
+        scale {int} -- Fixed point steps per unit
+
+    Returns:
+        Tuple[bytes, Optional[bytes]] -- The encoded values and the packed
+                                         null mask (None if nothing is missing)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+
+    fixed_point = np.round(values[~missing] * scale).astype(np.int64)
+    deltas = np.diff(fixed_point, prepend=0)
+    data = varint_encode(zigzag_encode(deltas))
+
+    null_mask = np.packbits(missing).tobytes() if missing.any() else None
+    return data, null_mask
+
+
+def decode_column(
+    data: bytes,  # pylint: disable=bad-continuation
+    null_mask: Optional[bytes],  # pylint: disable=bad-continuation
+    n_samples: int,  # pylint: disable=bad-continuation
+    scale: int,  # pylint: disable=bad-continuation
+) -> np.ndarray:  # pylint: disable=bad-continuation
+    """Decode a chunk of a column, see encode_column"""
+    present = np.cumsum(zigzag_decode(varint_decode(data))) / scale
+
+    if null_mask is None:
+        return present
+
+    missing = np.unpackbits(np.frombuffer(null_mask, dtype=np.uint8))[:n_samples]
+    values = np.full(n_samples, np.nan)
+    values[~missing.astype(bool)] = present
+    return values
+
+
+def iter_chunks(
+    data: pd.DataFrame, chunk_size: int = CHUNK_SIZE  # pylint: disable=bad-continuation
+) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Split a time series, sorted by time, into chunks of chunk_size samples"""
+    for chunk, start in enumerate(range(0, len(data), chunk_size)):
+        yield chunk, data.iloc[start : start + chunk_size]
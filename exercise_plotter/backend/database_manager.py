@@ -1,18 +1,41 @@
 import logging
 from contextlib import contextmanager
-from typing import List, Union, Any, Dict
+from typing import Iterator, List, Union, Any, Dict, Tuple
 
+import numpy as np
 import pandas as pd
-from sqlalchemy.schema import UniqueConstraint, ForeignKey
+from sqlalchemy.schema import UniqueConstraint, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import relationship
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy.orm import aliased, relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, LargeBinary, and_
+from sqlalchemy import func, select
 
 from exercise_plotter import Session
+from exercise_plotter.backend.dtypes import compact_frame
+from exercise_plotter.backend.fingerprint import hash_timeseries
+from exercise_plotter.backend.compression import (
+    CHUNK_SIZE,
+    column_scale,
+    decode_column,
+    encode_column,
+    iter_chunks,
+)
 
 OVERVIEW_TABLE_NAME = "exercises"
 TIMESERIES_TABLE_NAME = "exercises_timeseries"
+GRID_INDEX_TABLE_NAME = "exercises_grid_index"
+CHUNKS_TABLE_NAME = "exercises_timeseries_chunks"
+MEAN_MAX_TABLE_NAME = "exercises_mean_max"
+DATA_VERSION_TABLE_NAME = "exercises_data_version"
+
+# Size (in degrees) of the cells in the spatial grid index. 0.01 degrees
+# latitude is roughly 1.1 km
+GRID_CELL_SIZE = 0.01
+
+# Default half width (in degrees) of the window around the start and end
+# points of a segment, roughly 50 m
+SEGMENT_RADIUS = 0.0005
 
 Base = declarative_base()  # type: Any # pylint: disable=C0103
 
@@ -20,15 +43,25 @@ Base = declarative_base()  # type: Any # pylint: disable=C0103
 class Exercises(Base):  # pylint: disable=inherit-non-class, too-few-public-methods
     __tablename__ = TIMESERIES_TABLE_NAME
 
-    id = Column(Integer, primary_key=True)
+    # Nullable, as compressed exercises have no row ids
+    id = Column(Integer, primary_key=True, info={"dtype": "Int64"})
 
-    exercise_id = Column(Integer, ForeignKey("{}.id".format(OVERVIEW_TABLE_NAME)))
+    exercise_id = Column(
+        Integer,
+        ForeignKey("{}.id".format(OVERVIEW_TABLE_NAME)),
+        info={"dtype": "int32"},
+    )
+    # The time and the coordinates need the full precision, the time is the
+    # key of the paged reads. The coordinates are often missing altogether,
+    # their dtype keeps them from being read as objects then.
     time = Column(Float, nullable=False)
 
-    heart_rate = Column(Integer)
-    speed = Column(Float)
-    altitude = Column(Float)
-    distance = Column(Float)
+    heart_rate = Column(Integer, info={"dtype": "Int16"})
+    speed = Column(Float, info={"dtype": "float32"})
+    altitude = Column(Float, info={"dtype": "float32"})
+    distance = Column(Float, info={"dtype": "float32"})
+    latitude = Column(Float, info={"dtype": "float64"})
+    longitude = Column(Float, info={"dtype": "float64"})
 
     __table_args__ = (
         UniqueConstraint("exercise_id", "time", name="_time_unique_constraint_"),
@@ -48,27 +81,189 @@ class ExercisesOverview(
     id = Column(Integer, primary_key=True)
 
     timestamp = Column(DateTime, unique=True, nullable=False)
-    duration = Column(Float)
-    distance = Column(Float)
-    avg_heart_rate = Column(Integer)
-    max_heart_rate = Column(Integer)
-    avg_speed = Column(Float)
-    max_speed = Column(Float)
-    calories = Column(Integer)
-    fat_percentage_of_calories = Column(Float)
-    ascent = Column(Float)
-    descent = Column(Float)
-    max_altitude = Column(Float)
-    running_index = Column(Integer)
-    training_load = Column(Integer)
+    duration = Column(Float, info={"dtype": "float32"})
+    distance = Column(Float, info={"dtype": "float32"})
+    avg_heart_rate = Column(Integer, info={"dtype": "Int16"})
+    max_heart_rate = Column(Integer, info={"dtype": "Int16"})
+    avg_speed = Column(Float, info={"dtype": "float32"})
+    max_speed = Column(Float, info={"dtype": "float32"})
+    calories = Column(Integer, info={"dtype": "Int32"})
+    fat_percentage_of_calories = Column(Float, info={"dtype": "float32"})
+    ascent = Column(Float, info={"dtype": "float32"})
+    descent = Column(Float, info={"dtype": "float32"})
+    max_altitude = Column(Float, info={"dtype": "float32"})
+    running_index = Column(Integer, info={"dtype": "Int16"})
+    training_load = Column(Integer, info={"dtype": "Int16"})
     notes = Column(String)
 
+    # Content hashes of the imported file and of the time series, used to
+    # skip unchanged exercises when importing again
+    file_hash = Column(String, unique=True)
+    series_hash = Column(String)
+
     exercises = relationship("Exercises")
 
     def __repr__(self):
         return "<exercise(id='{}', timestamp='{}')>".format(self.id, self.timestamp)
 
 
+class ExercisesGridIndex(
+    Base  # pylint: disable=inherit-non-class, bad-continuation
+):  # pylint: disable=too-few-public-methods
+    """Spatial index of the GPS tracks. Every row is a run of consecutive
+    samples of an exercise that fall within the same grid cell, such that
+    samples within a region can be looked up by time range instead of
+    scanning the complete time series.
+    """
+
+    __tablename__ = GRID_INDEX_TABLE_NAME
+
+    id = Column(Integer, primary_key=True)
+
+    exercise_id = Column(
+        Integer, ForeignKey("{}.id".format(OVERVIEW_TABLE_NAME)), nullable=False
+    )
+    run = Column(Integer, nullable=False)
+    cell_latitude = Column(Integer, nullable=False)
+    cell_longitude = Column(Integer, nullable=False)
+    first_time = Column(Float, nullable=False)
+    last_time = Column(Float, nullable=False)
+
+    __table_args__ = (Index("_grid_cell_index_", "cell_latitude", "cell_longitude"),)
+
+    def __repr__(self):
+        return "<exercise_grid_index(exercise_id='{}', cell=({}, {}))>".format(
+            self.exercise_id, self.cell_latitude, self.cell_longitude
+        )
+
+
+class ExercisesChunks(
+    Base  # pylint: disable=inherit-non-class, bad-continuation
+):  # pylint: disable=too-few-public-methods
+    """Compressed storage of the time series. Every row holds a chunk of
+    one column of an exercise, encoded with exercise_plotter.backend.compression
+    """
+
+    __tablename__ = CHUNKS_TABLE_NAME
+
+    id = Column(Integer, primary_key=True)
+
+    exercise_id = Column(
+        Integer, ForeignKey("{}.id".format(OVERVIEW_TABLE_NAME)), nullable=False
+    )
+    column_name = Column(String, nullable=False)
+    chunk = Column(Integer, nullable=False)
+    first_time = Column(Float, nullable=False)
+    last_time = Column(Float, nullable=False)
+    n_samples = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    null_mask = Column(LargeBinary)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "exercise_id", "column_name", "chunk", name="_chunk_unique_constraint_"
+        ),
+    )
+
+    def __repr__(self):
+        return "<exercise_chunk(exercise_id='{}', column='{}', chunk='{}')>".format(
+            self.exercise_id, self.column_name, self.chunk
+        )
+
+
+class ExercisesMeanMax(
+    Base  # pylint: disable=inherit-non-class, bad-continuation
+):  # pylint: disable=too-few-public-methods
+    """Mean maximal curves, i.e. the best average value of a column over a
+    window of the given duration, see exercise_plotter.backend.analytics
+    """
+
+    __tablename__ = MEAN_MAX_TABLE_NAME
+
+    id = Column(Integer, primary_key=True)
+
+    exercise_id = Column(
+        Integer, ForeignKey("{}.id".format(OVERVIEW_TABLE_NAME)), nullable=False
+    )
+    column_name = Column(String, nullable=False)
+    duration = Column(Float, nullable=False)
+    value = Column(Float, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "exercise_id",
+            "column_name",
+            "duration",
+            name="_mean_max_unique_constraint_",
+        ),
+    )
+
+    def __repr__(self):
+        return "<exercise_mean_max(exercise_id='{}', column='{}')>".format(
+            self.exercise_id, self.column_name
+        )
+
+
+class ExercisesDataVersion(
+    Base  # pylint: disable=inherit-non-class, bad-continuation
+):  # pylint: disable=too-few-public-methods
+    """A single row counting the changes to the exercises, incremented by every
+    write of the DBManager. Used to tell whether cached reads are still valid.
+    """
+
+    __tablename__ = DATA_VERSION_TABLE_NAME
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return "<exercises_data_version(version='{}')>".format(self.version)
+
+
+# Bookkeeping columns of the overview that are not part of the exercise data
+HASH_COLUMNS = ["file_hash", "series_hash"]
+
+# Time series columns in the order they are given when reading
+TIMESERIES_COLUMNS = [
+    column.name
+    for column in Exercises.__table__.columns
+    if column.name not in ("id", "exercise_id")
+]
+
+
+def _column_list(column_names: Union[String, List]) -> List[str]:
+    if isinstance(column_names, list):
+        names = column_names
+    elif isinstance(column_names, str):
+        names = [name.strip() for name in column_names.split(",")]
+    else:
+        raise TypeError("column_names must be a string or a list of strings")
+
+    # Keep the order, but a column is only given once
+    return list(dict.fromkeys(names))
+
+
+def _grid_cell(coordinate):
+    return np.floor(np.asarray(coordinate) / GRID_CELL_SIZE).astype(int)
+
+
+def _group_passes(samples: pd.DataFrame) -> pd.DataFrame:
+    """Group samples (ordered by exercise_id and time) into passes. A pass is
+    broken whenever the exercise changes or the previous sample of the
+    exercise is not part of the samples, i.e. the track has left the region
+    in between.
+    """
+    new_pass = (samples["exercise_id"].diff() != 0) | (
+        samples["previous_time"] != samples["time"].shift()
+    )
+    passes = samples.groupby(new_pass.cumsum()).agg(
+        exercise_id=("exercise_id", "first"),
+        start_time=("time", "min"),
+        end_time=("time", "max"),
+    )
+    return passes.reset_index(drop=True)
+
+
 @contextmanager
 def session_scope():
     # pylint: disable=no-member
@@ -96,8 +291,20 @@ class DBManager:
             db.add_exercise(meta, data)
     """
 
-    def __init__(self, session):
+    def __init__(self, session, compressed: bool = False):
+        """
+        Arguments:
+            session {Session} -- The session used for all queries
+
+        Keyword Arguments:
+            compressed {bool} -- Store new time series as compressed chunks
+            (see exercise_plotter.backend.compression) instead of one row per
+            sample. The values are then stored with the precision given in
+            COLUMN_SCALES, and are not part of the spatial grid index. Reading
+            works for both storage modes regardless. (default: {False})
+        """
         self.session = session
+        self.compressed = compressed
 
     def get_excercise_time_series_values(
         self,  # pylint: disable=bad-continuation
@@ -120,35 +327,645 @@ class DBManager:
         Returns:
             pd.DataFrame -- [description]
         """
+        return self._get_time_series_range(exercise_id, column_names)
+
+    def get_excercise_time_series_window(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[String, List] = "*",  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get the part of the time series with start_time <= time <= end_time
+
+        Arguments:
+            excercise_id {int} -- The id of the exercise
+
+        Keyword Arguments:
+            start_time {float} -- Start of the window, open if None (default: {None})
+            end_time {float} -- End of the window, open if None (default: {None})
+            column_names {Union[str, List]} -- column names to provide.
+            All will be given by default. (default: {'*'})
+
+        Returns:
+            pd.DataFrame -- The samples within the window, ordered by time
+        """
+        return self._get_time_series_range(
+            exercise_id, column_names, start_time=start_time, end_time=end_time
+        )
+
+    def get_excercise_time_series_page(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        limit: int,  # pylint: disable=bad-continuation
+        after_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[String, List] = "*",  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get at most limit samples of the time series, starting after
+        after_time. The pages are keyed on (exercise_id, time), so the next
+        page is given by passing the last time value of the current page as
+        after_time. Include time in column_names in order to continue paging.
+
+        Arguments:
+            excercise_id {int} -- The id of the exercise
+            limit {int} -- The max number of samples in the page
+
+        Keyword Arguments:
+            after_time {float} -- Only give samples after this time. The
+            first page is given if None (default: {None})
+            column_names {Union[str, List]} -- column names to provide.
+            All will be given by default. (default: {'*'})
+
+        Returns:
+            pd.DataFrame -- The samples of the page, ordered by time
+        """
+        return self._get_time_series_range(
+            exercise_id, column_names, after_time=after_time, limit=limit
+        )
+
+    def iter_excercise_time_series(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        chunk_size: int = CHUNK_SIZE,  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        column_names: Union[String, List] = "*",  # pylint: disable=bad-continuation
+    ) -> Iterator[pd.DataFrame]:  # pylint: disable=bad-continuation
+        """Iterate over the time series in chunks of (at most) chunk_size
+        samples, such that the complete series is never held in memory.
+
+        Arguments:
+            excercise_id {int} -- The id of the exercise
+
+        Keyword Arguments:
+            chunk_size {int} -- The max number of samples in every chunk
+            (default: {CHUNK_SIZE})
+            start_time {float} -- Start of the window, open if None (default: {None})
+            end_time {float} -- End of the window, open if None (default: {None})
+            column_names {Union[str, List]} -- column names to provide.
+            All will be given by default. (default: {'*'})
+
+        Yields:
+            pd.DataFrame -- The samples of every chunk, ordered by time
+        """
+        column_names = _column_list(column_names)
+
+        # The time is required to continue with the next chunk
+        drop_time = column_names != ["*"] and "time" not in column_names
+        query_columns = column_names + ["time"] if drop_time else column_names
+
+        after_time = None
+        while True:
+            chunk = self._get_time_series_range(
+                exercise_id,
+                query_columns,
+                start_time=start_time,
+                end_time=end_time,
+                after_time=after_time,
+                limit=chunk_size,
+            )
+            if chunk.empty:
+                return
+
+            after_time = chunk["time"].iloc[-1]
+            yield chunk.drop("time", axis=1) if drop_time else chunk
+
+            if len(chunk) < chunk_size:
+                return
+
+    def _get_time_series_range(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        column_names: Union[String, List],  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        after_time: float = None,  # pylint: disable=bad-continuation
+        limit: int = None,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get the samples with start_time <= time <= end_time and
+        time > after_time, at most limit of them. Bounds set to None are open.
+        """
+        column_names = _column_list(column_names)
+
+        if self._is_compressed(exercise_id):
+            result = self._get_compressed_time_series_range(
+                exercise_id, column_names, start_time, end_time, after_time, limit
+            )
+            return compact_frame(result, Exercises.__table__)
+
+        if column_names == ["*"]:
+            query = self.session.query(Exercises)
+        else:
+            query = self.session.query(
+                *[Exercises.__table__.c[name] for name in column_names]
+            )
+
+        query = query.filter(Exercises.exercise_id == exercise_id)
+        if start_time is not None:
+            query = query.filter(Exercises.time >= start_time)
+        if end_time is not None:
+            query = query.filter(Exercises.time <= end_time)
+        if after_time is not None:
+            query = query.filter(Exercises.time > after_time)
+
+        query = query.order_by(Exercises.time).limit(limit)
+
+        result = pd.read_sql(query.statement, self.session.connection())
+        return compact_frame(result, Exercises.__table__)
+
+    def _is_compressed(self, exercise_id: Integer) -> bool:
+        query = self.session.query(ExercisesChunks.id).filter(
+            ExercisesChunks.exercise_id == exercise_id
+        )
+        return query.first() is not None
+
+    def _has_rows(self, exercise_id: Integer) -> bool:
+        query = self.session.query(Exercises.id).filter(
+            Exercises.exercise_id == exercise_id
+        )
+        return query.first() is not None
+
+    def _get_compressed_time_series_range(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        column_names: List[str],  # pylint: disable=bad-continuation
+        start_time: float = None,  # pylint: disable=bad-continuation
+        end_time: float = None,  # pylint: disable=bad-continuation
+        after_time: float = None,  # pylint: disable=bad-continuation
+        limit: int = None,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """See _get_time_series_range. The time bounds of every chunk are used
+        to only decode the chunks overlapping the requested range.
+        """
+        if all(bound is None for bound in (start_time, end_time, after_time, limit)):
+            return self._get_compressed_time_series_values(exercise_id, column_names)
+
+        query = self.session.query(ExercisesChunks.chunk).filter(
+            ExercisesChunks.exercise_id == exercise_id,
+            ExercisesChunks.column_name == "time",
+        )
+        if start_time is not None:
+            query = query.filter(ExercisesChunks.last_time >= start_time)
+        if end_time is not None:
+            query = query.filter(ExercisesChunks.first_time <= end_time)
+        if after_time is not None:
+            query = query.filter(ExercisesChunks.last_time > after_time)
+
+        query = query.order_by(ExercisesChunks.chunk)
+
+        # The first chunk might only be partly within the range
+        if limit is not None:
+            query = query.limit(-(-limit // CHUNK_SIZE) + 1)
+
+        chunks = [chunk for (chunk,) in query]
+
+        # The time is required to select the samples within the range
+        drop_time = column_names != ["*"] and "time" not in column_names
+        result = self._get_compressed_time_series_values(
+            exercise_id,
+            column_names + ["time"] if drop_time else column_names,
+            chunks=chunks,
+        )
+
+        time = result["time"]
+        in_range = pd.Series(True, index=result.index)
+        if start_time is not None:
+            in_range &= time >= start_time
+        if end_time is not None:
+            in_range &= time <= end_time
+        if after_time is not None:
+            in_range &= time > after_time
 
-        if isinstance(column_names, list):
-            column_names = ", ".join(column_names)
-        elif not isinstance(column_names, str):
-            raise TypeError("column_names must be a string or a list of strings")
+        result = result[in_range].head(limit).reset_index(drop=True)
+        if drop_time:
+            result = result.drop("time", axis=1)
+
+        return result
+
+    def _get_compressed_time_series_values(
+        self,  # pylint: disable=bad-continuation
+        exercise_id: Integer,  # pylint: disable=bad-continuation
+        column_names: List[str],  # pylint: disable=bad-continuation
+        chunks: List[int] = None,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Decode the time series of a compressed exercise. Only the requested
+        chunks (all by default) of the requested columns are read from the database.
+        """
+        if column_names == ["*"]:
+            column_names = TIMESERIES_COLUMNS
 
         query = (
-            self.session.query(Exercises)
-            .filter(Exercises.exercise_id == exercise_id)
-            .order_by(Exercises.time)
+            self.session.query(
+                ExercisesChunks.column_name,
+                ExercisesChunks.n_samples,
+                ExercisesChunks.data,
+                ExercisesChunks.null_mask,
+            )
+            .filter(ExercisesChunks.exercise_id == exercise_id)
+            .filter(ExercisesChunks.column_name.in_(column_names))
+            .order_by(ExercisesChunks.column_name, ExercisesChunks.chunk)
         )
+        if chunks is not None:
+            query = query.filter(ExercisesChunks.chunk.in_(chunks))
 
-        return pd.read_sql(query.statement, self.session.bind)
+        decoded = {}  # type: Dict[str, List]
+        for column_name, n_samples, data, null_mask in query:
+            decoded.setdefault(column_name, []).append(
+                decode_column(data, null_mask, n_samples, column_scale(column_name))
+            )
 
-    def get_exercise_overview(self) -> pd.DataFrame:
+        n_samples = max(
+            (sum(map(len, chunks)) for chunks in decoded.values()), default=0
+        )
+        result = pd.DataFrame(
+            {
+                name: (
+                    np.concatenate(decoded[name])
+                    if name in decoded
+                    else np.full(n_samples, np.nan)
+                )
+                for name in column_names
+            }
+        )
+
+        # Same columns as a "*" read of the row storage, the samples of a
+        # compressed exercise have no row id
+        if column_names == TIMESERIES_COLUMNS:
+            result.insert(0, "exercise_id", exercise_id)
+            result.insert(0, "id", pd.Series(pd.NA, index=result.index, dtype="Int64"))
+
+        return result
+
+    def exercises(self):
+        """Start a lazy query over the time series of the exercises, see
+        exercise_plotter.backend.query
+
+        Usage:
+            db.exercises().where(distance=(10, None)).select("speed").to_frame()
+
+        Returns:
+            ExerciseQuery -- A query including all exercises and columns
+        """
+        # The query module depends on the tables defined in this module
+        from exercise_plotter.backend.query import (  # pylint: disable=C0415
+            ExerciseQuery,
+        )
+
+        return ExerciseQuery(self.session)
+
+    def get_exercise_overview(self, include_notes: bool = False) -> pd.DataFrame:
         """Get the available excercises in the database. The function returns
         a pandas DataFrame that, among others, provides the excercise_id for
         each excercise. This can later be used used to retrieve time series
         data with the get_excercise_time_series_values function
 
+        Keyword Arguments:
+            include_notes {bool} -- Include the free text notes, which are
+            otherwise read with get_exercise_notes when needed (default: {False})
+
         Returns:
             pd.DataFrame -- [description]
         """
+        excluded = HASH_COLUMNS if include_notes else HASH_COLUMNS + ["notes"]
+        columns = [
+            column
+            for column in ExercisesOverview.__table__.columns
+            if column.name not in excluded
+        ]
+        query = self.session.query(*columns).order_by(ExercisesOverview.timestamp)
+
+        result = pd.read_sql(query.statement, self.session.connection())
+        return compact_frame(result, ExercisesOverview.__table__)
+
+    def get_exercise_notes(self, exercise_ids: List[int] = None) -> pd.Series:
+        """Get the notes of the exercises, which are not part of the overview
+        by default.
+
+        Keyword Arguments:
+            exercise_ids {List[int]} -- Only get the notes of these exercises.
+            All exercises by default. (default: {None})
+
+        Returns:
+            pd.Series -- The notes, indexed by the exercise id
+        """
+        query = self.session.query(ExercisesOverview.id, ExercisesOverview.notes)
+        if exercise_ids is not None:
+            query = query.filter(
+                ExercisesOverview.id.in_([int(e_id) for e_id in exercise_ids])
+            )
+        query = query.order_by(ExercisesOverview.timestamp)
+
+        result = pd.read_sql(query.statement, self.session.connection())
+        return result.set_index("id")["notes"]
+
+    def get_data_version(self) -> int:
+        """Get the change counter of the exercises. It is incremented by every
+        write, such that reads can be cached until it changes.
+
+        Returns:
+            int -- The number of writes, 0 for a new database
+        """
+        version = self.session.query(ExercisesDataVersion.version).scalar()
+        return version or 0
+
+    def _bump_data_version(self):
+        """Increment the change counter, see get_data_version. The caller commits."""
+        updated = self.session.query(ExercisesDataVersion).update(
+            {"version": ExercisesDataVersion.version + 1}
+        )
+        if not updated:
+            self.session.add(ExercisesDataVersion(version=1))
+
+    def get_mean_max_curves(
+        self,  # pylint: disable=bad-continuation
+        column_name: str,  # pylint: disable=bad-continuation
+        exercise_ids: List[int] = None,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get the stored mean maximal curves of a column. The curves are
+        computed with exercise_plotter.backend.analytics.update_mean_max_curves
+
+        Arguments:
+            column_name {str} -- The time series column of the curves
+
+        Keyword Arguments:
+            exercise_ids {List[int]} -- Exercises to get the curves for.
+            All will be given by default. (default: {None})
+
+        Returns:
+            pd.DataFrame -- The curves with the columns exercise_id, duration
+                            and value
+        """
+        query = self.session.query(
+            ExercisesMeanMax.exercise_id,
+            ExercisesMeanMax.duration,
+            ExercisesMeanMax.value,
+        ).filter(ExercisesMeanMax.column_name == column_name)
+
+        if exercise_ids is not None:
+            query = query.filter(
+                ExercisesMeanMax.exercise_id.in_([int(e_id) for e_id in exercise_ids])
+            )
+
+        query = query.order_by(ExercisesMeanMax.exercise_id, ExercisesMeanMax.duration)
+        return pd.read_sql(query.statement, self.session.connection())
+
+    def add_mean_max_curves(self, curves: pd.DataFrame):
+        """Store mean maximal curves. Existing curves for the same exercises
+        and columns are replaced.
+
+        Arguments:
+            curves {pd.DataFrame} -- The curves with the columns exercise_id,
+                                     column_name, duration and value
+        """
+        for (exercise_id, column_name), _ in curves.groupby(
+            ["exercise_id", "column_name"]
+        ):
+            self.session.query(ExercisesMeanMax).filter(
+                ExercisesMeanMax.exercise_id == int(exercise_id),
+                ExercisesMeanMax.column_name == column_name,
+            ).delete()
+
+        curves[["exercise_id", "column_name", "duration", "value"]].to_sql(
+            MEAN_MAX_TABLE_NAME,
+            self.session.connection(),
+            if_exists="append",
+            index=False,
+        )
+        self._bump_data_version()
+        self.session.commit()
+
+    def get_exercises_in_bounding_box(
+        self,  # pylint: disable=bad-continuation
+        min_latitude: float,  # pylint: disable=bad-continuation
+        min_longitude: float,  # pylint: disable=bad-continuation
+        max_latitude: float,  # pylint: disable=bad-continuation
+        max_longitude: float,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get all passes through the given bounding box. The grid index is used
+        to look up the candidate time ranges, such that only samples close to
+        the bounding box are read from the time series.
+
+        Arguments:
+            min_latitude {float} -- Southern boundary of the box
+            min_longitude {float} -- Western boundary of the box
+            max_latitude {float} -- Northern boundary of the box
+            max_longitude {float} -- Eastern boundary of the box
+
+        Returns:
+            pd.DataFrame -- One row per pass with the columns exercise_id,
+                            start_time and end_time
+        """
+        # The time of the previous sample of the exercise, looked up in the
+        # index of the unique (exercise_id, time) constraint
+        previous = aliased(Exercises)
+        previous_time = (
+            select(func.max(previous.time))
+            .where(
+                previous.exercise_id == Exercises.exercise_id,
+                previous.time < Exercises.time,
+            )
+            .correlate(Exercises)
+            .scalar_subquery()
+        )
+
+        query = (
+            self.session.query(
+                ExercisesGridIndex.exercise_id,
+                Exercises.time,
+                previous_time.label("previous_time"),
+            )
+            .join(
+                Exercises,
+                and_(
+                    Exercises.exercise_id == ExercisesGridIndex.exercise_id,
+                    Exercises.time.between(
+                        ExercisesGridIndex.first_time, ExercisesGridIndex.last_time
+                    ),
+                ),
+            )
+            .filter(
+                ExercisesGridIndex.cell_latitude.between(
+                    int(_grid_cell(min_latitude)), int(_grid_cell(max_latitude))
+                ),
+                ExercisesGridIndex.cell_longitude.between(
+                    int(_grid_cell(min_longitude)), int(_grid_cell(max_longitude))
+                ),
+                Exercises.latitude.between(min_latitude, max_latitude),
+                Exercises.longitude.between(min_longitude, max_longitude),
+            )
+            .order_by(ExercisesGridIndex.exercise_id, Exercises.time)
+        )
+
+        samples = [
+            pd.read_sql(query.statement, self.session.connection())
+        ] + self._get_compressed_samples_in_bounding_box(
+            min_latitude, min_longitude, max_latitude, max_longitude
+        )
+        samples = [frame for frame in samples if not frame.empty]
+        if not samples:
+            return pd.DataFrame(columns=["exercise_id", "start_time", "end_time"])
+
+        samples = pd.concat(samples, ignore_index=True)
+        return _group_passes(samples.sort_values(["exercise_id", "time"]))
 
-        query = self.session.query(ExercisesOverview).order_by(
-            ExercisesOverview.timestamp
+    def _get_compressed_samples_in_bounding_box(
+        self,  # pylint: disable=bad-continuation
+        min_latitude: float,  # pylint: disable=bad-continuation
+        min_longitude: float,  # pylint: disable=bad-continuation
+        max_latitude: float,  # pylint: disable=bad-continuation
+        max_longitude: float,  # pylint: disable=bad-continuation
+    ) -> List[pd.DataFrame]:  # pylint: disable=bad-continuation
+        """The samples of the compressed exercises in the bounding box, one frame
+        with the columns exercise_id, time and previous_time per exercise. The
+        time range of the candidate grid cells is decoded, and the samples are
+        filtered with pandas.
+        """
+        candidates = (
+            self.session.query(
+                ExercisesGridIndex.exercise_id,
+                func.min(ExercisesGridIndex.first_time),
+                func.max(ExercisesGridIndex.last_time),
+            )
+            .filter(
+                ExercisesGridIndex.cell_latitude.between(
+                    int(_grid_cell(min_latitude)), int(_grid_cell(max_latitude))
+                ),
+                ExercisesGridIndex.cell_longitude.between(
+                    int(_grid_cell(min_longitude)), int(_grid_cell(max_longitude))
+                ),
+                ExercisesGridIndex.exercise_id.in_(
+                    select(ExercisesChunks.exercise_id).distinct()
+                ),
+            )
+            .group_by(ExercisesGridIndex.exercise_id)
         )
 
-        return pd.read_sql(query.statement, self.session.bind)
+        samples = []
+        for exercise_id, first_time, last_time in candidates:
+            track = self._get_time_series_range(
+                exercise_id,
+                ["time", "latitude", "longitude"],
+                start_time=first_time,
+                end_time=last_time,
+            )
+            # The previous sample of the first one is outside of the window,
+            # which starts a new pass in any case
+            track["previous_time"] = track["time"].shift()
+            track = track[
+                track["latitude"].between(min_latitude, max_latitude)
+                & track["longitude"].between(min_longitude, max_longitude)
+            ]
+            samples.append(
+                track[["time", "previous_time"]].assign(exercise_id=exercise_id)
+            )
+
+        return samples
+
+    def get_segment_passes(
+        self,  # pylint: disable=bad-continuation
+        start: Tuple[float, float],  # pylint: disable=bad-continuation
+        end: Tuple[float, float],  # pylint: disable=bad-continuation
+        radius: float = SEGMENT_RADIUS,  # pylint: disable=bad-continuation
+    ) -> pd.DataFrame:  # pylint: disable=bad-continuation
+        """Get all passes over the segment going from start to end. A pass
+        starts when the track leaves the window around the start point and
+        ends when it first reaches the window around the end point, without
+        returning to the start in between.
+
+        Arguments:
+            start {Tuple[float, float]} -- (latitude, longitude) of the start point
+            end {Tuple[float, float]} -- (latitude, longitude) of the end point
+
+        Keyword Arguments:
+            radius {float} -- Half width in degrees of the window around
+            the start and end points (default: {SEGMENT_RADIUS})
+
+        Returns:
+            pd.DataFrame -- One row per pass with the columns exercise_id,
+                            start_time and end_time
+        """
+        starts, ends = [
+            self.get_exercises_in_bounding_box(
+                point[0] - radius,
+                point[1] - radius,
+                point[0] + radius,
+                point[1] + radius,
+            )
+            for point in (start, end)
+        ]
+
+        if starts.empty or ends.empty:
+            return pd.DataFrame(columns=["exercise_id", "start_time", "end_time"])
+
+        starts = starts.sort_values(["exercise_id", "start_time"])
+        next_start = starts.groupby("exercise_id")["start_time"].shift(-1)
+        starts["next_start_time"] = next_start
+
+        # The pass starts when leaving the start window, and is matched with
+        # the first arrival at the end window after that
+        passes = pd.merge_asof(
+            starts[["exercise_id", "end_time", "next_start_time"]]
+            .rename(columns={"end_time": "start_time"})
+            .sort_values("start_time"),
+            ends[["exercise_id"]]
+            .assign(end_time=ends["start_time"])
+            .sort_values("end_time"),
+            left_on="start_time",
+            right_on="end_time",
+            by="exercise_id",
+            direction="forward",
+            allow_exact_matches=False,
+        )
+
+        # Only keep the last start before reaching the end point
+        passes = passes.dropna(subset=["end_time"])
+        passes = passes[
+            passes["next_start_time"].isnull()
+            | (passes["end_time"] < passes["next_start_time"])
+        ]
+
+        return (
+            passes[["exercise_id", "start_time", "end_time"]]
+            .sort_values(["exercise_id", "start_time"])
+            .reset_index(drop=True)
+        )
+
+    def _update_grid_index(self, exercise_id: Integer):
+        """Rebuild the grid index for the given exercise from the stored
+        latitude and longitude values, in either storage mode.
+        """
+        track = self._get_time_series_range(
+            exercise_id, ["time", "latitude", "longitude"]
+        ).dropna(subset=["latitude", "longitude"])
+
+        self.session.query(ExercisesGridIndex).filter(
+            ExercisesGridIndex.exercise_id == exercise_id
+        ).delete()
+
+        if track.empty:
+            return
+
+        track["cell_latitude"] = _grid_cell(track["latitude"])
+        track["cell_longitude"] = _grid_cell(track["longitude"])
+
+        new_cell = (track["cell_latitude"].diff() != 0) | (
+            track["cell_longitude"].diff() != 0
+        )
+        runs = track.groupby((new_cell.cumsum() - 1).rename("run")).agg(
+            cell_latitude=("cell_latitude", "first"),
+            cell_longitude=("cell_longitude", "first"),
+            first_time=("time", "min"),
+            last_time=("time", "max"),
+        )
+        runs = runs.reset_index()
+        runs["exercise_id"] = exercise_id
+
+        runs.to_sql(
+            GRID_INDEX_TABLE_NAME,
+            self.session.connection(),
+            if_exists="append",
+            index=False,
+        )
 
     def add_exercise(self, meta: Dict, data: pd.DataFrame = None) -> Integer:
         """Add an exercise to the database. The metadata should contain single element
@@ -160,6 +977,9 @@ class DBManager:
         Likewise, the timeseries must contain a time value. The timeseries can be added
         at a later stage with <add_timeseries>.
 
+        The exercise and the timeseries are added in one transaction. If writing
+        fails, nothing is added and the error is raised.
+
         Arguments:
             meta {Dict} -- The metadata for an exercise
             data {pd.DataFrame} -- Timeseries values
@@ -180,37 +1000,137 @@ class DBManager:
 
         try:
             exercise = ExercisesOverview(**meta)
-            self.session.add(exercise)
-            self.session.commit()
+            if data is not None:
+                exercise.series_hash = hash_timeseries(data)
 
-            if data is None:
-                return exercise.id
+            self.session.add(exercise)
 
-            # Do not modify input dataframe
-            data = data.copy()
+            # The exercise and its time series are written in one transaction,
+            # flushing assigns the exercise id
+            self.session.flush()
 
-            data["exercise_id"] = exercise.id
+            if data is not None:
+                self._insert_timeseries(exercise.id, data)
 
-            # if_exists refers only to if a table already exists, which it always should
-            # given that the database setup has been completed.
-            data.to_sql(
-                TIMESERIES_TABLE_NAME,
-                self.session.connection(),
-                if_exists="append",
-                index=False,
-            )
+            self._bump_data_version()
             self.session.commit()
 
-        # Currently, this is how we handle a situation where we try to add an
-        # excercise that already exists.
-        except IntegrityError as err:
+        # Do not leave a partly written exercise behind
+        except (IntegrityError, pd.io.sql.DatabaseError) as err:
             logging.warning(str(err))
+            self.session.rollback()
+            raise
 
-        except pd.io.sql.DatabaseError as err:
+        return exercise.id
+
+    def get_exercise_id_by_file_hash(self, file_hash: str) -> Union[int, None]:
+        """Get the id of the exercise imported from the file with the given
+        hash (see exercise_plotter.backend.fingerprint.hash_file), or None
+        if the file has not been imported.
+        """
+        query = self.session.query(ExercisesOverview.id).filter(
+            ExercisesOverview.file_hash == file_hash
+        )
+        result = query.first()
+
+        return None if result is None else result.id
+
+    def sync_exercise(
+        self,  # pylint: disable=bad-continuation
+        meta: Dict,  # pylint: disable=bad-continuation
+        data: pd.DataFrame,  # pylint: disable=bad-continuation
+        file_hash: str = None,  # pylint: disable=bad-continuation
+    ) -> Integer:  # pylint: disable=bad-continuation
+        """Import an exercise that might have been imported before, e.g. when
+        syncing a watch export. Exercises are identified by their timestamp.
+
+        - If the file hash is known, nothing is done (one indexed lookup).
+        - Otherwise the metadata and the file hash are updated, and the
+          complete time series is replaced unless it is unchanged, in a single
+          transaction. The exercise is added if it is new.
+
+        Arguments:
+            meta {Dict} -- The metadata for an exercise
+            data {pd.DataFrame} -- Timeseries values
+
+        Keyword Arguments:
+            file_hash {str} -- Hash of the imported file, see
+            exercise_plotter.backend.fingerprint.hash_file (default: {None})
+
+        Returns:
+            Integer -- The exercise_id
+        """
+        if file_hash is not None:
+            exercise_id = self.get_exercise_id_by_file_hash(file_hash)
+            if exercise_id is not None:
+                return exercise_id
+
+        exercise = (
+            self.session.query(ExercisesOverview)
+            .filter(ExercisesOverview.timestamp == meta["timestamp"])
+            .first()
+        )
+
+        if exercise is None:
+            return self.add_exercise(dict(meta, file_hash=file_hash), data)
+
+        series_hash = hash_timeseries(data)
+
+        try:
+            for key, value in meta.items():
+                setattr(exercise, key, value)
+            if file_hash is not None:
+                exercise.file_hash = file_hash
+
+            changed = series_hash != exercise.series_hash
+            if changed:
+                exercise.series_hash = series_hash
+                self._delete_timeseries(exercise.id)
+                self._insert_timeseries(exercise.id, data)
+
+            # Setting equal values does not count as a modification
+            if changed or self.session.is_modified(exercise):
+                self._bump_data_version()
+            self.session.commit()
+
+        except (IntegrityError, pd.io.sql.DatabaseError) as err:
             logging.warning(str(err))
+            self.session.rollback()
+            raise
 
         return exercise.id
 
+    def _insert_timeseries(self, exercise_id: Integer, data: pd.DataFrame):
+        """Write the time series of an exercise without any stored values,
+        in the storage mode of the manager. The caller commits.
+        """
+        if self.compressed:
+            self._add_compressed_timeseries(exercise_id, data)
+            return
+
+        # Do not modify input dataframe
+        data = data.copy()
+        data["exercise_id"] = exercise_id
+
+        # if_exists refers only to if a table already exists, which it always should
+        # given that the database setup has been completed.
+        data.to_sql(
+            TIMESERIES_TABLE_NAME,
+            self.session.connection(),
+            if_exists="append",
+            index=False,
+        )
+
+        if {"latitude", "longitude"} & set(data.columns):
+            self._update_grid_index(exercise_id)
+
+    def _delete_timeseries(self, exercise_id: Integer):
+        """Delete the time series of an exercise, in both storage modes, and
+        everything derived from it. The caller commits.
+        """
+        for table in (Exercises, ExercisesChunks, ExercisesGridIndex, ExercisesMeanMax):
+            self.session.query(table).filter(table.exercise_id == exercise_id).delete()
+
     def add_timeseries(self, exercise_id: Integer, data: pd.DataFrame):
         """Add a timeseries to the given exercise_id. The <time> column
         is required to be in the DataFrame, a KeyError will be raised if
@@ -228,6 +1148,32 @@ class DBManager:
             data {pd.DataFrame} -- The timeseries dataframe
         """
 
+        # The stored series no longer matches the hash of an import
+        self.session.query(ExercisesOverview).filter(
+            ExercisesOverview.id == exercise_id
+        ).update({"series_hash": None})
+
+        # The mean max curves are recomputed by update_mean_max_curves
+        self.session.query(ExercisesMeanMax).filter(
+            ExercisesMeanMax.exercise_id == exercise_id
+        ).delete()
+
+        # An exercise keeps the storage mode of its existing samples, the mode
+        # of the manager only applies to exercises without any
+        if self._is_compressed(exercise_id) or (
+            self.compressed and not self._has_rows(exercise_id)
+        ):
+            try:
+                self._add_compressed_timeseries(exercise_id, data)
+            except pd.io.sql.DatabaseError as err:
+                logging.warning(str(err))
+                self.session.rollback()
+                raise
+
+            self._bump_data_version()
+            self.session.commit()
+            return
+
         try:
             existing_entries = (
                 self.session.query(Exercises)
@@ -257,7 +1203,70 @@ class DBManager:
                 if_exists="append",
                 index=False,
             )
+
+            if {"latitude", "longitude"} & set(data.columns):
+                self._update_grid_index(exercise_id)
+
+            self._bump_data_version()
             self.session.commit()
 
         except pd.io.sql.DatabaseError as err:
             logging.warning(str(err))
+
+    def _add_compressed_timeseries(self, exercise_id: Integer, data: pd.DataFrame):
+        """Merge data into the compressed time series of the exercise and
+        rewrite its chunks. Values at existing time values are overwritten.
+
+        Raises:
+            DatabaseError: data has columns that are not time series columns,
+            like for the row storage. Nothing is written.
+        """
+        unknown = [name for name in data.columns if name not in TIMESERIES_COLUMNS]
+        if unknown:
+            raise pd.io.sql.DatabaseError(
+                "table {} has no column named {}".format(
+                    TIMESERIES_TABLE_NAME, ", ".join(unknown)
+                )
+            )
+
+        data = data.set_index(data["time"].astype(float))
+
+        if self._is_compressed(exercise_id):
+            existing = self._get_compressed_time_series_values(
+                exercise_id, TIMESERIES_COLUMNS
+            )
+            existing = existing.set_index("time", drop=False)
+            merged = existing.reindex(existing.index.union(data.index))
+            merged.loc[data.index, data.columns] = data
+            data = merged
+
+        update_grid_index = bool({"latitude", "longitude"} & set(data.columns))
+
+        data = data.sort_index().reset_index(drop=True)
+        columns = [name for name in TIMESERIES_COLUMNS if name in data.columns]
+
+        self.session.query(ExercisesChunks).filter(
+            ExercisesChunks.exercise_id == exercise_id
+        ).delete()
+
+        for chunk, chunk_data in iter_chunks(data):
+            for column_name in columns:
+                encoded, null_mask = encode_column(
+                    chunk_data[column_name].to_numpy(dtype=float),
+                    column_scale(column_name),
+                )
+                self.session.add(
+                    ExercisesChunks(
+                        exercise_id=exercise_id,
+                        column_name=column_name,
+                        chunk=chunk,
+                        first_time=float(chunk_data["time"].iloc[0]),
+                        last_time=float(chunk_data["time"].iloc[-1]),
+                        n_samples=len(chunk_data),
+                        data=encoded,
+                        null_mask=null_mask,
+                    )
+                )
+
+        if update_grid_index:
+            self._update_grid_index(exercise_id)
@@ -0,0 +1,72 @@
+"""
+Compact dtypes for the DataFrames read from the database. The dtype of a
+column is defined once, in the info of the table column, e.g.
+
+    speed = Column(Float, info={"dtype": "float32"})
+
+Columns without a dtype keep the dtype given by pandas. Integer columns use
+the nullable pandas integer dtypes (e.g. "Int16"), such that missing values
+do not turn them into floats.
+
+Usage:
+    from exercise_plotter.backend.dtypes import memory_report
+
+    print(memory_report({"overview": db.get_exercise_overview()}))
+"""
+
+from typing import Dict
+
+import pandas as pd
+
+
+def column_dtypes(table) -> Dict[str, str]:
+    """The compact dtypes of the columns of a table, by column name"""
+    return {
+        column.name: column.info["dtype"]
+        for column in table.columns
+        if "dtype" in column.info
+    }
+
+
+def compact_frame(frame: pd.DataFrame, table) -> pd.DataFrame:
+    """Convert the columns of a frame read from the table to their compact
+    dtypes, see column_dtypes. The frame is converted in place and returned.
+    """
+    for name, dtype in column_dtypes(table).items():
+        if name not in frame.columns:
+            continue
+
+        values = frame[name]
+        if pd.api.types.is_integer_dtype(dtype):
+            # Integer columns are read as floats when they contain NULL
+            values = pd.to_numeric(values).round()
+        frame[name] = values.astype(dtype)
+
+    return frame
+
+
+def memory_report(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """The memory used by every frame, including the content of object columns
+
+    Arguments:
+        frames {Dict[str, pd.DataFrame]} -- The frames, by name
+
+    Returns:
+        pd.DataFrame -- The rows, columns, bytes and bytes_per_row of every
+                        frame, indexed by name
+    """
+    report = pd.DataFrame(
+        [
+            {
+                "name": name,
+                "rows": len(frame),
+                "columns": len(frame.columns),
+                "bytes": int(frame.memory_usage(index=True, deep=True).sum()),
+            }
+            for name, frame in frames.items()
+        ],
+        columns=["name", "rows", "columns", "bytes"],
+    ).set_index("name")
+
+    report["bytes_per_row"] = report["bytes"] / report["rows"].where(report["rows"] > 0)
+    return report
@@ -0,0 +1,281 @@
+"""
+Streaming export of the time series of several exercises to CSV or Parquet.
+The series are read in chunks with DBManager.iter_excercise_time_series and
+every chunk is encoded as soon as it is read (a row group for Parquet), such
+that the memory use does not depend on the size of the export. Writing to
+Parquet requires pyarrow.
+
+Usage:
+    python -m exercise_plotter.backend.export example.db exercises.csv
+    python -m exercise_plotter.backend.export example.db exercises.parquet \\
+        --filter distance 10 20 --columns time,speed
+"""
+
+import argparse
+import os
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from exercise_plotter import Session
+from exercise_plotter.backend.compression import CHUNK_SIZE
+from exercise_plotter.backend.database_manager import (
+    TIMESERIES_COLUMNS,
+    DBManager,
+    ExercisesOverview,
+    session_scope,
+    _column_list,
+)
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+# The overview columns the exercises can be filtered on
+FILTER_COLUMNS = tuple(
+    column.name
+    for column in ExercisesOverview.__table__.columns
+    if column.type.python_type in (int, float)
+)
+
+
+def select_exercises(
+    overview: pd.DataFrame,  # pylint: disable=bad-continuation
+    filters: Dict[str, Tuple[float, float]] = None,  # pylint: disable=bad-continuation
+) -> List[int]:  # pylint: disable=bad-continuation
+    """Get the ids of the exercises in the overview where every filtered
+    column is within its (minimum, maximum) range, inclusive.
+    """
+    selected = pd.Series(True, index=overview.index)
+    for name, (minimum, maximum) in (filters or {}).items():
+        selected &= overview[name].between(minimum, maximum)
+
+    return [int(e_id) for e_id in overview.loc[selected, "id"]]
+
+
+def export_columns(column_names: Union[str, List] = "*") -> List[str]:
+    """The columns of the chunks given by iter_export_chunks"""
+    column_names = _column_list(column_names)
+    if column_names == ["*"]:
+        column_names = TIMESERIES_COLUMNS
+
+    return ["exercise_id"] + list(column_names)
+
+
+def iter_export_chunks(
+    db_man: DBManager,  # pylint: disable=bad-continuation
+    exercise_ids: Iterable[int],  # pylint: disable=bad-continuation
+    column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    chunk_size: int = CHUNK_SIZE,  # pylint: disable=bad-continuation
+) -> Iterator[pd.DataFrame]:  # pylint: disable=bad-continuation
+    """Iterate over the time series of the exercises in chunks. Every chunk
+    has an exercise_id column followed by the requested columns as floats,
+    such that all chunks share the same schema.
+    """
+    column_names = export_columns(column_names)[1:]
+
+    for exercise_id in exercise_ids:
+        for chunk in db_man.iter_excercise_time_series(
+            int(exercise_id), chunk_size=chunk_size, column_names=column_names
+        ):
+            chunk = chunk.astype(float)
+            chunk.insert(0, "exercise_id", int(exercise_id))
+            yield chunk
+
+
+def iter_csv(
+    chunks: Iterable[pd.DataFrame],  # pylint: disable=bad-continuation
+    columns: List[str] = None,  # pylint: disable=bad-continuation
+) -> Iterator[bytes]:  # pylint: disable=bad-continuation
+    """Encode the chunks as CSV, with the header written before the first
+    chunk. Without any chunk, only the header of the given columns is written.
+    """
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+    if header and columns is not None:
+        yield pd.DataFrame(columns=columns).to_csv(index=False).encode()
+
+
+class _StreamSink:
+    """Write only file object that hands out the written bytes when drained,
+    while keeping track of the position as Parquet needs it for the footer.
+    """
+
+    def __init__(self):
+        self._parts = []  # type: List[bytes]
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(
+    chunks: Iterable[pd.DataFrame],  # pylint: disable=bad-continuation
+    columns: List[str] = None,  # pylint: disable=bad-continuation
+) -> Iterator[bytes]:  # pylint: disable=bad-continuation
+    """Encode the chunks as a Parquet file, with one row group per chunk.
+    Without any chunk, an empty file with the given columns is written, with
+    the schema of iter_export_chunks.
+    """
+    # pyarrow is only required when exporting to Parquet
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    sink = _StreamSink()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+
+    if writer is None and columns is not None:
+        writer = pq.ParquetWriter(
+            sink,
+            pa.schema(
+                [("exercise_id", pa.int64())]
+                + [(name, pa.float64()) for name in columns[1:]]
+            ),
+        )
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def iter_export(
+    chunks: Iterable[pd.DataFrame],  # pylint: disable=bad-continuation
+    file_format: str,  # pylint: disable=bad-continuation
+    columns: List[str] = None,  # pylint: disable=bad-continuation
+) -> Iterator[bytes]:  # pylint: disable=bad-continuation
+    """Encode the chunks in the given format, see EXPORT_FORMATS. The columns
+    (see export_columns) give the header or schema of an export without chunks.
+    """
+    if file_format == "csv":
+        return iter_csv(chunks, columns)
+    if file_format == "parquet":
+        return iter_parquet(chunks, columns)
+
+    raise ValueError(
+        "Unknown export format {}, must be one of {}".format(
+            file_format, ", ".join(EXPORT_FORMATS)
+        )
+    )
+
+
+def export_exercises(
+    db_man: DBManager,  # pylint: disable=bad-continuation
+    output,  # pylint: disable=bad-continuation
+    file_format: str,  # pylint: disable=bad-continuation
+    filters: Dict[str, Tuple[float, float]] = None,  # pylint: disable=bad-continuation
+    column_names: Union[str, List] = "*",  # pylint: disable=bad-continuation
+    chunk_size: int = CHUNK_SIZE,  # pylint: disable=bad-continuation
+) -> List[int]:  # pylint: disable=bad-continuation
+    """Export the time series of the exercises matching the overview filters
+
+    Arguments:
+        db_man {DBManager} -- Manager used to read the exercises
+        output {BinaryIO} -- File object the export is written to
+        file_format {str} -- One of EXPORT_FORMATS
+
+    Keyword Arguments:
+        filters {Dict[str, Tuple[float, float]]} -- Overview column names
+        mapped to the (minimum, maximum) range of selected exercises. All
+        exercises are exported by default. (default: {None})
+        column_names {Union[str, List]} -- column names to export.
+        All will be given by default. (default: {'*'})
+        chunk_size {int} -- The number of samples read and written at a time
+        (default: {CHUNK_SIZE})
+
+    Returns:
+        List[int] -- The ids of the exported exercises
+    """
+    exercise_ids = select_exercises(db_man.get_exercise_overview(), filters)
+    chunks = iter_export_chunks(db_man, exercise_ids, column_names, chunk_size)
+
+    for data in iter_export(chunks, file_format, export_columns(column_names)):
+        output.write(data)
+
+    return exercise_ids
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Export the time series of exercises to CSV or Parquet"
+    )
+    parser.add_argument("database", help="Path to the sqlite database")
+    parser.add_argument("output", help="The file to write the export to")
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="Export format, given by the extension of the output by default",
+    )
+    parser.add_argument(
+        "--filter",
+        nargs=3,
+        action="append",
+        default=[],
+        metavar=("COLUMN", "MIN", "MAX"),
+        help="Only export exercises with the overview column within [MIN, MAX]",
+    )
+    parser.add_argument(
+        "--columns", default="*", help="Comma separated time series columns"
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(args)
+
+    file_format = args.format or os.path.splitext(args.output)[1].lstrip(".")
+    if file_format not in EXPORT_FORMATS:
+        parser.error("Unable to determine the export format, use --format")
+
+    for name, _, _ in args.filter:
+        if name not in FILTER_COLUMNS:
+            parser.error(
+                "Unable to filter on {}, must be one of {}".format(
+                    name, ", ".join(FILTER_COLUMNS)
+                )
+            )
+
+    try:
+        filters = {name: (float(low), float(high)) for name, low, high in args.filter}
+    except ValueError:
+        parser.error("The bounds of --filter must be numbers")
+
+    Session.configure(bind=create_engine("sqlite:///{}".format(args.database)))
+    with session_scope() as session, open(args.output, "wb") as output:
+        exercise_ids = export_exercises(
+            DBManager(session),
+            output,
+            file_format,
+            filters=filters,
+            column_names=args.columns,
+            chunk_size=args.chunk_size,
+        )
+
+    print("Exported {} exercises to {}".format(len(exercise_ids), args.output))
+
+
+if __name__ == "__main__":
+    main()
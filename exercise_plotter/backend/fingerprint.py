@@ -0,0 +1,43 @@
+"""
+Content hashes used to recognise files and time series that have already
+been imported, such that re-importing an export only rewrites what changed.
+
+Usage:
+    from exercise_plotter.backend.fingerprint import hash_file, hash_timeseries
+
+    file_hash = hash_file("exercise.tcx")
+    series_hash = hash_timeseries(data)
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+_BLOCK_SIZE = 2**20
+
+
+def hash_file(path: str) -> str:
+    """The SHA-256 hex digest of the content of the file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for block in iter(lambda: file_handle.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def hash_timeseries(data: pd.DataFrame) -> str:
+    """The SHA-256 hex digest of a time series. The hash does not depend on
+    the order of the rows or the columns, nor on the dtypes of the columns.
+    Columns containing only missing values are ignored, as they are not
+    distinguishable from columns that are not present once stored.
+    """
+    data = data.dropna(axis=1, how="all").sort_values("time")
+
+    digest = hashlib.sha256()
+    for column in sorted(data.columns):
+        digest.update(column.encode())
+        digest.update(data[column].to_numpy(dtype=float, na_value=np.nan).tobytes())
+
+    return digest.hexdigest()
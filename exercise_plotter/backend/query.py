@@ -0,0 +1,278 @@
+"""
+Lazy, composable queries over the time series of several exercises. Every
+method returns a new query, nothing is read from the database before the
+query is executed with to_frame or to_numpy. The complete query compiles to
+a single SQL statement, including the filtering on the exercise overview and
+the resampling, such that only the requested rows are read.
+
+Exercises stored in compressed chunks (see DBManager) can not be read with
+SQL. The ones matching the conditions are decoded with the DBManager, and
+their time window, columns and resampling are applied with pandas before
+they are combined with the result of the statement.
+
+Usage:
+    with session_scope() as session:
+        db = DBManager(session)
+        data = (
+            db.exercises()
+            .where(distance=(10, None))
+            .between(0, 3600)
+            .select("speed", "heart_rate")
+            .resample("10s")
+            .to_frame()
+        )
+"""
+
+import copy
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, and_, cast, func, select
+
+from exercise_plotter.backend.database_manager import (
+    DBManager,
+    Exercises,
+    ExercisesChunks,
+    ExercisesOverview,
+)
+from exercise_plotter.backend.dtypes import compact_frame
+
+AGGREGATES = {
+    "avg": func.avg,
+    "min": func.min,
+    "max": func.max,
+    "sum": func.sum,
+    "count": func.count,
+}
+
+# The pandas aggregates used for the compressed exercises
+_PANDAS_AGGREGATES = {
+    "avg": "mean",
+    "min": "min",
+    "max": "max",
+    "sum": "sum",
+    "count": "count",
+}
+
+
+def _seconds(interval: Union[str, float]) -> float:
+    if isinstance(interval, str):
+        return pd.Timedelta(interval).total_seconds()
+    return float(interval)
+
+
+class ExerciseQuery:
+    """
+    A lazy query over the time series of the exercises, see the module
+    documentation. Create it with DBManager.exercises().
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._conditions = []  # type: list
+        self._columns = []  # type: list
+        self._start_time = None  # type: Union[float, None]
+        self._end_time = None  # type: Union[float, None]
+        self._interval = None  # type: Union[float, None]
+        self._aggregate = "avg"
+
+    def _copy(self) -> "ExerciseQuery":
+        query = copy.copy(self)
+        query._conditions = list(self._conditions)
+        return query
+
+    def where(self, *conditions, **ranges: Tuple) -> "ExerciseQuery":
+        """Only include exercises matching the conditions on the overview.
+
+        Arguments:
+            conditions -- SQLAlchemy expressions on ExercisesOverview, e.g.
+                          ExercisesOverview.distance > 10
+            ranges -- Overview column names mapped to an inclusive
+                      (minimum, maximum) range, where None is open
+        """
+        query = self._copy()
+        query._conditions.extend(conditions)
+
+        for name, (minimum, maximum) in ranges.items():
+            column = ExercisesOverview.__table__.c[name]
+            if minimum is not None:
+                query._conditions.append(column >= minimum)
+            if maximum is not None:
+                query._conditions.append(column <= maximum)
+
+        return query
+
+    def between(self, start_time: float = None, end_time: float = None):
+        """Only include samples with start_time <= time <= end_time, where
+        the time is the time since the start of every exercise.
+        """
+        query = self._copy()
+        query._start_time = start_time
+        query._end_time = end_time
+        return query
+
+    def select(self, *column_names: str) -> "ExerciseQuery":
+        """Only include the given time series columns. The exercise_id and
+        time are always included.
+        """
+        query = self._copy()
+        query._columns = [
+            name for name in dict.fromkeys(column_names) if name != "exercise_id"
+        ]
+        return query
+
+    def resample(
+        self,  # pylint: disable=bad-continuation
+        interval: Union[str, float],  # pylint: disable=bad-continuation
+        aggregate: str = "avg",  # pylint: disable=bad-continuation
+    ) -> "ExerciseQuery":  # pylint: disable=bad-continuation
+        """Aggregate the samples of every exercise into buckets of the given
+        interval. The time of a bucket is the start of its interval.
+
+        Arguments:
+            interval {Union[str, float]} -- Bucket length, in seconds or as
+                                            a string such as "10s" or "1min"
+
+        Keyword Arguments:
+            aggregate {str} -- One of AGGREGATES (default: {"avg"})
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError(
+                "Unknown aggregate {}, must be one of {}".format(
+                    aggregate, ", ".join(AGGREGATES)
+                )
+            )
+
+        query = self._copy()
+        query._interval = _seconds(interval)
+        query._aggregate = aggregate
+        return query
+
+    def _column_names(self) -> List[str]:
+        """The selected columns, except exercise_id and time"""
+        table = Exercises.__table__
+        names = self._columns or [
+            column.name
+            for column in table.columns
+            if column.name not in ("id", "exercise_id", "time")
+        ]
+        # Unknown columns raise a KeyError, like in the statement
+        return [table.c[name].name for name in names if name != "time"]
+
+    @property
+    def statement(self):
+        """The SQL statement of the query. It only reads the exercises stored
+        as rows, see the module documentation.
+        """
+        table = Exercises.__table__
+        columns = [table.c[name] for name in self._column_names()]
+
+        conditions = list(self._conditions)
+        if self._start_time is not None:
+            conditions.append(table.c.time >= self._start_time)
+        if self._end_time is not None:
+            conditions.append(table.c.time <= self._end_time)
+
+        if self._interval is None:
+            time = table.c.time
+            selected = [table.c.exercise_id, time] + columns
+        else:
+            # Buckets start at multiples of the interval, time is never negative
+            time = cast(table.c.time / self._interval, Integer) * self._interval
+            aggregate = AGGREGATES[self._aggregate]
+            selected = [table.c.exercise_id, time.label("time")] + [
+                aggregate(column).label(column.name) for column in columns
+            ]
+
+        statement = select(*selected).select_from(
+            table.join(
+                ExercisesOverview.__table__,
+                ExercisesOverview.__table__.c.id == table.c.exercise_id,
+            )
+        )
+        if conditions:
+            statement = statement.where(and_(*conditions))
+
+        if self._interval is not None:
+            statement = statement.group_by(table.c.exercise_id, time)
+
+        return statement.order_by(table.c.exercise_id, time)
+
+    def __str__(self):
+        return str(self.statement.compile(compile_kwargs={"literal_binds": True}))
+
+    def _compressed_exercise_ids(self) -> List[int]:
+        """The ids of the compressed exercises matching the conditions"""
+        statement = (
+            select(ExercisesChunks.exercise_id)
+            .distinct()
+            .select_from(
+                ExercisesChunks.__table__.join(
+                    ExercisesOverview.__table__,
+                    ExercisesOverview.__table__.c.id == ExercisesChunks.exercise_id,
+                )
+            )
+            .order_by(ExercisesChunks.exercise_id)
+        )
+        if self._conditions:
+            statement = statement.where(and_(*self._conditions))
+
+        return [exercise_id for (exercise_id,) in self.session.execute(statement)]
+
+    def _read_compressed(self, exercise_id: int) -> pd.DataFrame:
+        """Read a compressed exercise in the same form as the statement"""
+        column_names = self._column_names()
+        data = DBManager(self.session).get_excercise_time_series_window(
+            exercise_id,
+            start_time=self._start_time,
+            end_time=self._end_time,
+            column_names=["time"] + column_names,
+        )
+
+        if self._interval is not None:
+            time = (data["time"] // self._interval) * self._interval
+            data = (
+                data[column_names]
+                .astype(float)
+                .groupby(time.rename("time"))
+                .agg(_PANDAS_AGGREGATES[self._aggregate])
+                .reset_index()
+            )
+
+        data.insert(0, "exercise_id", exercise_id)
+        return data
+
+    def to_frame(self) -> pd.DataFrame:
+        """Execute the query
+
+        Returns:
+            pd.DataFrame -- The exercise_id, time and the selected columns,
+                            ordered by exercise_id and time. Without
+                            resampling, the columns have their compact
+                            dtypes (see exercise_plotter.backend.dtypes)
+        """
+        result = pd.read_sql(self.statement, self.session.connection())
+
+        compressed = [
+            self._read_compressed(exercise_id)
+            for exercise_id in self._compressed_exercise_ids()
+        ]
+        compressed = [data for data in compressed if not data.empty]
+        if compressed:
+            frames = [result] + compressed if not result.empty else compressed
+            result = (
+                pd.concat(frames, ignore_index=True)
+                .sort_values(["exercise_id", "time"], kind="stable")
+                .reset_index(drop=True)
+            )
+
+        # Resampled values are aggregates, e.g. averaged heart rates
+        if self._interval is None:
+            result = compact_frame(result, Exercises.__table__)
+
+        return result
+
+    def to_numpy(self) -> np.ndarray:
+        """Execute the query, see to_frame"""
+        return self.to_frame().to_numpy()
@@ -0,0 +1,196 @@
+"""
+Read only HTTP API for the exercise data, mounted on the Flask server of the
+app. Scripts and dashboards can poll it cheaply: every response carries an
+ETag derived from the change counter of the database (see
+DBManager.get_data_version), and a request with a matching If-None-Match
+header is answered with 304 Not Modified without reading any exercise data.
+
+Endpoints:
+    /api/overview
+        The exercise overview, without the notes
+    /api/exercises/<exercise_id>/series?columns=time,speed&start=0&end=60
+        The time series of one exercise, optionally within a time window
+    /api/query?distance=10,20&columns=speed&start=0&end=60&resample=10s
+        The time series of all exercises matching the overview ranges, see
+        exercise_plotter.backend.query. A range with an empty bound is open.
+        aggregate=max sets the aggregate of the resampling. Compressed
+        exercises are included, they are decoded and resampled with pandas.
+
+The data is given as JSON (the "split" orientation of pandas) by default, or
+as an Arrow IPC stream when requested with format=arrow or an Accept header
+of ARROW_MIME_TYPE, which requires pyarrow. Responses are gzip compressed
+when the client accepts it.
+"""
+
+import gzip
+import hashlib
+import io
+from typing import Callable, Tuple, Union
+
+import flask
+import pandas as pd
+
+from exercise_plotter.backend.database_manager import DBManager, session_scope
+from exercise_plotter.frontend.app import server
+
+JSON_MIME_TYPE = "application/json"
+ARROW_MIME_TYPE = "application/vnd.apache.arrow.stream"
+
+MIME_TYPES = {"json": JSON_MIME_TYPE, "arrow": ARROW_MIME_TYPE}
+
+# Smaller responses are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+# Query parameters that are not ranges on the overview
+_QUERY_PARAMETERS = ("columns", "start", "end", "resample", "aggregate", "format")
+
+
+def _encode_json(data: pd.DataFrame) -> bytes:
+    return data.to_json(orient="split", index=False, date_format="iso").encode()
+
+
+def _encode_arrow(data: pd.DataFrame) -> bytes:
+    # pyarrow is only required when the data is requested as Arrow
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue()
+
+
+ENCODERS = {"json": _encode_json, "arrow": _encode_arrow}
+
+
+def _response_format() -> str:
+    """The format requested with the format parameter or the Accept header"""
+    file_format = flask.request.args.get("format")
+    if file_format is None:
+        best = flask.request.accept_mimetypes.best_match(
+            [JSON_MIME_TYPE, ARROW_MIME_TYPE], default=JSON_MIME_TYPE
+        )
+        file_format = "arrow" if best == ARROW_MIME_TYPE else "json"
+
+    if file_format not in ENCODERS:
+        flask.abort(406)
+
+    return file_format
+
+
+def _etag(data_version: int, file_format: str) -> str:
+    """The ETag of the response to the current request. It changes with the
+    data version, the requested resource and the format.
+    """
+    digest = hashlib.sha1(
+        "{}|{}".format(flask.request.full_path, file_format).encode()
+    ).hexdigest()
+
+    return "{}-{}".format(data_version, digest[:16])
+
+
+def _float_arg(name: str) -> Union[float, None]:
+    value = flask.request.args.get(name)
+    if value is None or value == "":
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        flask.abort(400)
+
+
+def _range_arg(value: str) -> Tuple[Union[float, None], Union[float, None]]:
+    """Parse a "minimum,maximum" range, where an empty bound is open"""
+    try:
+        minimum, maximum = value.split(",")
+        return (
+            float(minimum) if minimum else None,
+            float(maximum) if maximum else None,
+        )
+    except ValueError:
+        flask.abort(400)
+
+
+def _respond(read: Callable[[DBManager], pd.DataFrame]) -> flask.Response:
+    """Answer the current request with the data given by read, or with 304
+    Not Modified if the client has the current version already.
+    """
+    file_format = _response_format()
+
+    with session_scope() as session:
+        db_man = DBManager(session)
+        etag = _etag(db_man.get_data_version(), file_format)
+
+        if flask.request.if_none_match.contains_weak(etag):
+            response = flask.Response(status=304)
+        else:
+            try:
+                data = read(db_man)
+            except (KeyError, ValueError):
+                flask.abort(400)
+
+            body = ENCODERS[file_format](data)
+            response = flask.Response(body, mimetype=MIME_TYPES[file_format])
+            if len(body) >= GZIP_MIN_SIZE and "gzip" in flask.request.accept_encodings:
+                response.set_data(gzip.compress(body))
+                response.content_encoding = "gzip"
+
+    # The representations of one version share the ETag, whatever the encoding
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    response.vary.update(["Accept", "Accept-Encoding"])
+
+    return response
+
+
+@server.route("/api/overview")
+def api_overview():
+    """The exercise overview"""
+    return _respond(lambda db_man: db_man.get_exercise_overview())
+
+
+@server.route("/api/exercises/<int:exercise_id>/series")
+def api_series(exercise_id):
+    """The time series of one exercise, see the module documentation"""
+    column_names = flask.request.args.get("columns", "*")
+    start_time = _float_arg("start")
+    end_time = _float_arg("end")
+
+    return _respond(
+        lambda db_man: db_man.get_excercise_time_series_window(
+            exercise_id,
+            start_time=start_time,
+            end_time=end_time,
+            column_names=column_names,
+        )
+    )
+
+
+@server.route("/api/query")
+def api_query():
+    """The time series of the exercises matching the overview ranges, see the
+    module documentation
+    """
+    args = flask.request.args
+    ranges = {
+        name: _range_arg(value)
+        for name, value in args.items()
+        if name not in _QUERY_PARAMETERS
+    }
+    start_time = _float_arg("start")
+    end_time = _float_arg("end")
+
+    def read(db_man):
+        query = db_man.exercises().where(**ranges).between(start_time, end_time)
+        if "columns" in args:
+            query = query.select(*args["columns"].split(","))
+        if "resample" in args:
+            query = query.resample(
+                args["resample"], aggregate=args.get("aggregate", "avg")
+            )
+
+        return query.to_frame()
+
+    return _respond(read)
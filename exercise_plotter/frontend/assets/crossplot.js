@@ -0,0 +1,28 @@
+// Clientside callbacks, registered with app.clientside_callback in callbacks.py
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    crossplot: {
+        // The overview is stored column wise, see util.columnar_data
+        update: function (x_axis_value, y_axis_value, overview) {
+            if (!overview || !(x_axis_value in overview) || !(y_axis_value in overview)) {
+                return window.dash_clientside.no_update;
+            }
+
+            return {
+                data: [
+                    {
+                        type: "scatter",
+                        x: overview[x_axis_value],
+                        y: overview[y_axis_value],
+                        mode: "markers",
+                        marker: {size: 10},
+                    },
+                ],
+                layout: {
+                    title: {text: "Training Results"},
+                    yaxis: {title: {text: y_axis_value}},
+                    xaxis: {title: {text: x_axis_value}},
+                },
+            };
+        },
+    },
+});
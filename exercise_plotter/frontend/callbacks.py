@@ -4,35 +4,23 @@ import plotly.graph_objects as go
 from exercise_plotter.backend.database_manager import session_scope, DBManager
 from exercise_plotter.frontend.util import load_exercise_overview, _get_filter_options
 from exercise_plotter.frontend.app import app
-
+from exercise_plotter.frontend.downloads import download_url
 
 data = load_exercise_overview()
 _filter_options = _get_filter_options(data)
 
 
-@app.callback(
+# The overview is stored in the browser (see index.py), such that switching
+# axes in the crossplot does not require a request to the server
+app.clientside_callback(
+    dash.dependencies.ClientsideFunction(namespace="crossplot", function_name="update"),
     dash.dependencies.Output("crossplot_graph", "figure"),
     [
         dash.dependencies.Input("cp_x_axis_dropdown", "value"),
         dash.dependencies.Input("cp_y_axis_dropdown", "value"),
     ],
+    [dash.dependencies.State("overview_store", "data")],
 )
-def update_crossplot(x_axis_value, y_axis_value):
-    return {
-        "data": [
-            go.Scatter(
-                x=data[x_axis_value].values,
-                y=data[y_axis_value].values,
-                mode="markers",
-                marker={"size": 10},
-            )
-        ],
-        "layout": go.Layout(
-            title="Training Results",
-            yaxis={"title": y_axis_value},
-            xaxis={"title": x_axis_value},
-        ),
-    }
 
 
 filter_input = [
@@ -52,25 +40,18 @@ filter_input = [
 def update_timeseriesplot(x_axis_value, y_axis_value, *filters):
 
     parameters = [option["name"] for option in _filter_options]
-    exercise_ids = data["id"].values
 
-    for parameter_name, (minimum, maximum) in zip(parameters, filters):
-        exercise_ids = [
-            e_id
-            for e_id in exercise_ids
-            if minimum <= float(data[data["id"] == e_id][parameter_name]) <= maximum
-        ]
-
-    timeseries_data = []
+    # The overview filters are applied in the same query reading the series
     with session_scope() as session:
         db_man = DBManager(session)
-        for exercise_id in exercise_ids:
-            timeseries_data.append(
-                db_man.get_excercise_time_series_values(
-                    exercise_id=int(exercise_id),
-                    column_names=[x_axis_value, y_axis_value],
-                )
-            )
+        query = (
+            db_man.exercises()
+            .where(**dict(zip(parameters, filters)))
+            .select(x_axis_value, y_axis_value)
+        )
+        selected_data = query.to_frame()
+
+    timeseries_data = [ts_data for _, ts_data in selected_data.groupby("exercise_id")]
 
     return {
         "data": [
@@ -88,3 +69,17 @@ def update_timeseriesplot(x_axis_value, y_axis_value, *filters):
             xaxis={"title": x_axis_value},
         ),
     }
+
+
+@app.callback(
+    [
+        dash.dependencies.Output("ts_download_csv", "href"),
+        dash.dependencies.Output("ts_download_parquet", "href"),
+    ],
+    filter_input,
+)
+def update_download_links(*filters):
+    parameters = [option["name"] for option in _filter_options]
+    selected = dict(zip(parameters, filters))
+
+    return [download_url(file_format, selected) for file_format in ("csv", "parquet")]
@@ -0,0 +1,87 @@
+from urllib.parse import urlencode
+
+import flask
+
+from exercise_plotter.backend.database_manager import (
+    TIMESERIES_COLUMNS,
+    DBManager,
+    session_scope,
+    _column_list,
+)
+from exercise_plotter.backend.export import (
+    EXPORT_FORMATS,
+    FILTER_COLUMNS,
+    MIME_TYPES,
+    export_columns,
+    iter_export,
+    iter_export_chunks,
+    select_exercises,
+)
+from exercise_plotter.frontend.app import server
+
+
+def download_url(file_format, filters, column_names=None):
+    """The url of the export of the exercises matching the filters.
+
+    Arguments:
+        file_format {str} -- One of EXPORT_FORMATS
+        filters {Dict[str, Tuple[float, float]]} -- Overview column names
+        mapped to the (minimum, maximum) range of selected exercises
+
+    Keyword Arguments:
+        column_names {List[str]} -- Time series columns to export, all by
+        default (default: {None})
+    """
+    query = {
+        name: "{},{}".format(minimum, maximum)
+        for name, (minimum, maximum) in filters.items()
+    }
+    if column_names:
+        query["columns"] = ",".join(column_names)
+
+    return "/download/{}?{}".format(file_format, urlencode(query))
+
+
+@server.route("/download/<file_format>")
+def download(file_format):
+    """Stream the export of the exercises, see download_url for the query
+    parameters. The response is sent while the exercises are read, chunk
+    by chunk.
+    """
+    if file_format not in EXPORT_FORMATS:
+        flask.abort(404)
+
+    # The request is validated before the response starts, errors while
+    # streaming would give a truncated file instead
+    args = flask.request.args.to_dict()
+    column_names = _column_list(args.pop("columns", "*"))
+    if column_names != ["*"] and not set(column_names) <= set(TIMESERIES_COLUMNS):
+        flask.abort(400)
+
+    if not set(args) <= set(FILTER_COLUMNS):
+        flask.abort(400)
+
+    try:
+        filters = {}
+        for name, bounds in args.items():
+            minimum, maximum = bounds.split(",")
+            filters[name] = (float(minimum), float(maximum))
+    except ValueError:
+        flask.abort(400)
+
+    def generate():
+        with session_scope() as session:
+            db_man = DBManager(session)
+            exercise_ids = select_exercises(db_man.get_exercise_overview(), filters)
+            chunks = iter_export_chunks(db_man, exercise_ids, column_names)
+            yield from iter_export(chunks, file_format, export_columns(column_names))
+
+    return flask.Response(
+        flask.stream_with_context(generate()),
+        mimetype=MIME_TYPES[file_format],
+        headers={
+            "Content-Disposition": "attachment; filename=exercises.{}".format(
+                file_format
+            )
+        },
+    )
@@ -1,3 +1,5 @@
+import logging
+
 import dash_core_components as dcc
 import dash_html_components as html
 from dash.dependencies import Input, Output
@@ -8,11 +10,14 @@ from exercise_plotter.frontend.layouts import crossplot_layout, timeseries_layou
 from exercise_plotter.frontend.util import (
     load_exercise_overview,
     available_timeseries_parameters,
+    columnar_data,
     _get_filter_options,
 )
 from exercise_plotter import Session
+from exercise_plotter.backend.dtypes import memory_report
 # Required import of callbacks, even though it is not explicitly used in this file
 import exercise_plotter.frontend.callbacks  # pylint: disable=unused-import
+import exercise_plotter.frontend.api  # pylint: disable=unused-import
 
 engine = create_engine("sqlite:///example.db")  # pylint: disable=invalid-name
 Session.configure(bind=engine)
@@ -24,6 +29,8 @@ _filter_options = _get_filter_options(data)
 app.layout = html.Div(
     [
         html.H1(children="Exercise Plotter"),
+        # Sent to the browser once, used by the clientside callbacks
+        dcc.Store(id="overview_store", data=columnar_data(data)),
         dcc.Tabs(
             id="tabs_selection",
             value="crossplot",
@@ -50,4 +57,9 @@ def render_content(tab):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger(__name__).info(
+        "Memory used by the cached frames:\n%s", memory_report({"overview": data})
+    )
+
     app.run_server(debug=True)
@@ -45,6 +45,25 @@ def sidebar_layout(id_prefix, axis_options, filter_options=None):
     return sidebar
 
 
+def download_layout(id_prefix):
+    """Links to the export of the time series, the href is set by a callback"""
+    return [
+        html.Div(
+            [
+                html.A(
+                    children="Download {}".format(file_format.upper()),
+                    id="{}_download_{}".format(id_prefix, file_format),
+                    download="exercises.{}".format(file_format),
+                    href="",
+                    style={"padding": "0 1em"},
+                )
+                for file_format in ("csv", "parquet")
+            ],
+            style={"padding-top": "2em"},
+        )
+    ]
+
+
 def crossplot_layout(axis_options):
     return html.Div(
         children=[
@@ -86,7 +105,8 @@ def timeseries_layout(axis_options, filter_options):
                             id_prefix="ts",
                             axis_options=axis_options,
                             filter_options=filter_options,
-                        ),
+                        )
+                        + download_layout(id_prefix="ts"),
                         className="three columns",
                         style={"text-align": "center"},
                     ),
@@ -41,6 +41,29 @@ def available_timeseries_parameters():
     return timeseries_data.columns
 
 
+def columnar_data(data: pd.DataFrame) -> dict:
+    """Encode a DataFrame as one list of values per column, which is the
+    format the clientside callbacks expect. Columns that are not numeric
+    (e.g. timestamps) are given as strings and missing values as None.
+
+    Arguments:
+        data {pd.DataFrame} -- The data to encode
+
+    Returns:
+        dict -- Column name mapped to the list of values
+    """
+    columns = {}
+    for col in data.columns:
+        values = data[col]
+        missing = values.isna()
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str)
+        # Nullable integer columns give pd.NA, which is not JSON serializable
+        columns[col] = values.astype(object).where(~missing, None).tolist()
+
+    return columns
+
+
 def _get_filter_options(data):
     filter_options = []
     for col in data.columns:
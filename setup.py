@@ -8,6 +8,13 @@ setup(
     url="https://github.com/lars-petter-hauge/exercise_plotter",
     description="Plotter application for plotting training data",
     packages=find_packages(),
+    python_requires=">=3.7",
     setup_requires=["setuptools_scm"],
-    install_requires=["pandas", "sqlalchemy"],
+    install_requires=["numpy", "pandas", "sqlalchemy"],
+    extras_require={"async": ["sqlalchemy>=1.4", "aiosqlite"], "parquet": ["pyarrow"]},
+    entry_points={
+        "console_scripts": [
+            "exercise-plotter-export=exercise_plotter.backend.export:main"
+        ]
+    },
 )
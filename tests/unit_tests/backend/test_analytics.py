@@ -0,0 +1,138 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.analytics import (
+    heart_rate_zone_distribution,
+    mean_max_curves,
+    resample,
+    rolling_mean,
+    update_mean_max_curves,
+)
+from exercise_plotter.backend.database_manager import DBManager
+
+# pylint: disable=redefined-outer-name
+
+
+def _brute_force_mean_max(values, duration):
+    return max(
+        np.mean(values[start : start + duration])
+        for start in range(len(values) - duration + 1)
+    )
+
+
+def test_resample_interpolates_onto_uniform_grid():
+    result = resample(np.array([0.0, 2.0, 3.0]), np.array([10.0, 30.0, np.nan]))
+
+    np.testing.assert_allclose(result, [10.0, 20.0, 30.0])
+
+
+def test_rolling_mean():
+    result = rolling_mean(np.array([1.0, 2.0, 3.0, 4.0]), window=2)
+
+    np.testing.assert_allclose(result, [1.5, 2.5, 3.5])
+
+
+def test_mean_max_curves_matches_brute_force():
+    rng = np.random.default_rng(0)
+    series = [rng.normal(size=50), rng.normal(size=20), rng.normal(size=3)]
+    durations = [1, 2, 5, 20, 30]
+
+    curves = mean_max_curves(series, durations=durations)
+
+    for row, values in enumerate(series):
+        for column, duration in enumerate(durations):
+            if duration > len(values):
+                assert np.isnan(curves[row, column])
+            else:
+                assert curves[row, column] == pytest.approx(
+                    _brute_force_mean_max(values, duration)
+                )
+
+
+def test_mean_max_curves_unsorted_durations():
+    curves = mean_max_curves([np.array([1.0, 2.0, 3.0, 4.0, 5.0])], durations=[10, 1])
+
+    np.testing.assert_array_equal(curves, [[np.nan, 5.0]])
+
+
+def test_heart_rate_zone_distribution():
+    time = np.array([0, 10, 20, 30, 40])
+    heart_rate = np.array([90, 110, 150, 195, np.nan])
+
+    result = heart_rate_zone_distribution(time, heart_rate, max_heart_rate=200)
+
+    np.testing.assert_allclose(result, [10, 10, 0, 10, 0, 10])
+
+
+@pytest.fixture()
+def db_manager(session):
+    return DBManager(session)
+
+
+def test_update_mean_max_curves(db_manager):
+    data = pd.DataFrame(
+        {
+            "time": [0.0, 1.0, 2.0, 3.0],
+            "speed": [1.0, 3.0, 2.0, 1.0],
+            "heart_rate": [100, 120, 140, 130],
+        }
+    )
+    exercise_id = db_manager.add_exercise(
+        meta={"timestamp": datetime.datetime(2000, 1, 1)}, data=data
+    )
+
+    update_mean_max_curves(db_manager, durations=[1, 2, 10])
+
+    results = db_manager.get_mean_max_curves("speed")
+    expected = pd.DataFrame(
+        {"exercise_id": [exercise_id] * 2, "duration": [1.0, 2.0], "value": [3.0, 2.5]}
+    )
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+    # Recomputing replaces the stored curves
+    update_mean_max_curves(db_manager, durations=[1, 2, 10])
+    assert len(db_manager.get_mean_max_curves("heart_rate")) == 2
+
+
+@pytest.mark.parametrize("compressed", [False, True], ids=["rows", "compressed"])
+def test_add_timeseries_invalidates_mean_max_curves(session, compressed):
+    db_manager = DBManager(session, compressed=compressed)
+    data = pd.DataFrame({"time": [0.0, 1.0, 2.0], "speed": [1.0, 3.0, 2.0]})
+    exercise_id = db_manager.add_exercise(
+        meta={"timestamp": datetime.datetime(2000, 1, 1)}, data=data
+    )
+    update_mean_max_curves(db_manager, columns=["speed"], durations=[1])
+    assert len(db_manager.get_mean_max_curves("speed")) == 1
+
+    db_manager.add_timeseries(
+        exercise_id=exercise_id, data=pd.DataFrame({"time": [3.0], "speed": [9.0]})
+    )
+
+    assert db_manager.get_mean_max_curves("speed").empty
+
+
+def test_update_mean_max_curves_batches(db_manager, monkeypatch):
+    for day, speed in enumerate([1.0, 2.0, 3.0], start=1):
+        db_manager.add_exercise(
+            meta={"timestamp": datetime.datetime(2000, 1, day)},
+            data=pd.DataFrame({"time": [0.0, 1.0], "speed": [speed, speed]}),
+        )
+
+    batches = []
+    add_mean_max_curves = db_manager.add_mean_max_curves
+    monkeypatch.setattr(
+        db_manager,
+        "add_mean_max_curves",
+        lambda curves: batches.append(len(curves)) or add_mean_max_curves(curves),
+    )
+
+    curves = update_mean_max_curves(
+        db_manager, columns=["speed"], durations=[1], batch_size=2
+    )
+
+    assert batches == [2, 1]
+    assert list(curves["value"]) == [1.0, 2.0, 3.0]
+    assert len(db_manager.get_mean_max_curves("speed")) == 3
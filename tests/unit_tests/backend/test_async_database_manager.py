@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.database_manager import Base
+
+pytest.importorskip("aiosqlite")
+
+# pylint: disable=wrong-import-position
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from exercise_plotter.backend.async_database_manager import (  # noqa: E402
+    AsyncDBManager,
+    AsyncSession,
+    async_session_scope,
+)
+
+# pylint: disable=redefined-outer-name
+
+DUMMY_DATA = pd.DataFrame(
+    {"time": [0, 1, 2, 3], "heart_rate": [120, 121, 122, 123], "speed": [3, 4, 5, 6]}
+)
+
+
+def _meta(day):
+    return {"timestamp": datetime.datetime(2000, 1, day)}
+
+
+@pytest.fixture()
+def engine(tmp_path):
+    engine = create_async_engine("sqlite+aiosqlite:///{}".format(tmp_path / "test.db"))
+    AsyncSession.configure(bind=engine)
+
+    async def create():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_add_and_get_exercise(engine):  # pylint: disable=unused-argument
+    async def run():
+        async with async_session_scope() as session:
+            db_man = AsyncDBManager(session)
+            exercise_id = await db_man.add_exercise(_meta(1), DUMMY_DATA)
+
+        async with async_session_scope() as session:
+            db_man = AsyncDBManager(session)
+            overview = await db_man.get_exercise_overview()
+            series = await db_man.get_excercise_time_series_values(
+                exercise_id, column_names=["time", "heart_rate"]
+            )
+        return exercise_id, overview, series
+
+    exercise_id, overview, series = asyncio.run(run())
+
+    assert list(overview["id"]) == [exercise_id]
+    pd.testing.assert_frame_equal(
+        series, DUMMY_DATA[["time", "heart_rate"]], check_dtype=False
+    )
+
+
+def test_get_excercise_time_series_values_many(engine):  # pylint: disable=W0613
+    async def run():
+        async with async_session_scope() as session:
+            db_man = AsyncDBManager(session, compressed=True)
+            exercise_ids = [
+                await db_man.add_exercise(_meta(day), DUMMY_DATA + day)
+                for day in range(1, 4)
+            ]
+            return exercise_ids, await db_man.get_excercise_time_series_values_many(
+                exercise_ids[::-1], column_names="speed"
+            )
+
+    exercise_ids, results = asyncio.run(run())
+
+    assert len(exercise_ids) == 3
+    assert [list(result["speed"]) for result in results] == [
+        [6, 7, 8, 9],
+        [5, 6, 7, 8],
+        [4, 5, 6, 7],
+    ]
+
+
+def test_iter_excercise_time_series(engine):  # pylint: disable=unused-argument
+    async def run():
+        async with async_session_scope() as session:
+            db_man = AsyncDBManager(session)
+            exercise_id = await db_man.add_exercise(_meta(1), DUMMY_DATA)
+            return [
+                chunk
+                async for chunk in db_man.iter_excercise_time_series(
+                    exercise_id, chunk_size=3, column_names="speed"
+                )
+            ]
+
+    chunks = asyncio.run(run())
+
+    assert [list(chunk["speed"]) for chunk in chunks] == [[3, 4, 5], [6]]
+
+
+def test_sync_exercise(engine):  # pylint: disable=unused-argument
+    async def run():
+        async with async_session_scope() as session:
+            db_man = AsyncDBManager(session)
+            exercise_id = await db_man.sync_exercise(
+                _meta(1), DUMMY_DATA, file_hash="abc"
+            )
+            return exercise_id, [
+                await db_man.get_exercise_id_by_file_hash(file_hash)
+                for file_hash in ("abc", "def")
+            ]
+
+    exercise_id, found = asyncio.run(run())
+
+    assert found == [exercise_id, None]
@@ -5,6 +5,9 @@ from sqlalchemy import create_engine
 
 from exercise_plotter import Session
 from exercise_plotter.backend.database_manager import (
+    CHUNK_SIZE,
+    CHUNKS_TABLE_NAME,
+    HASH_COLUMNS,
     OVERVIEW_TABLE_NAME,
     TIMESERIES_TABLE_NAME,
     Base,
@@ -82,13 +85,32 @@ DUMMY_DATA_TWO = pd.DataFrame.from_dict(
     }
 )
 
+DUMMY_TRACK = pd.DataFrame.from_dict(
+    {
+        "time": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+        "latitude": [60.0, 60.01, 60.02, 60.03, 60.04, 60.05, 60.04, 60.03, 60.02]
+        + [60.01, 60.0],
+        "longitude": [10.05] * 11,
+    }
+)
+
+
+def _drop_unset_columns(result, expected):
+    # Optional columns (e.g. latitude and longitude) are not part of all dummy data
+    unset_columns = [
+        col
+        for col in result.columns
+        if col not in expected.columns and result[col].isnull().all()
+    ]
+    return result.drop(unset_columns, axis=1)
+
 
 def _assert_db_content(overview_results=None, timeseries_results=None):
 
     if overview_results is not None:
         # Verify exercise overview
         result = pd.read_sql(OVERVIEW_TABLE_NAME, engine)
-        result = result.drop("id", axis=1)
+        result = result.drop(["id"] + HASH_COLUMNS, axis=1)
 
         if isinstance(overview_results, dict):
             overview_results = pd.DataFrame(overview_results, index=[0])
@@ -103,6 +125,7 @@ def _assert_db_content(overview_results=None, timeseries_results=None):
         # Verify time series
         result = pd.read_sql(TIMESERIES_TABLE_NAME, engine)
         result = result.drop(["id", "exercise_id"], axis=1)
+        result = _drop_unset_columns(result, timeseries_results)
 
         assert set(result.columns) == set(timeseries_results.columns)
         # reorder columns
@@ -293,7 +316,7 @@ def test_get_exercise_overview(db_manager):
     db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
     db_manager.add_exercise(meta=DUMMY_META_TWO, data=DUMMY_DATA_TWO)
 
-    results = db_manager.get_exercise_overview()
+    results = db_manager.get_exercise_overview(include_notes=True)
 
     expected_dummy_one = pd.Series(DUMMY_META_ONE)
     results_one = results.iloc[0].drop("id").reindex(index=expected_dummy_one.index)
@@ -308,9 +331,413 @@ def test_get_exercise_overview(db_manager):
     pd.testing.assert_series_equal(results_two, expected_dummy_two)
 
 
+def test_get_exercise_overview_compact(db_manager):
+    db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+    db_manager.add_exercise(meta=dict(DUMMY_META_TWO, calories=None))
+
+    results = db_manager.get_exercise_overview()
+
+    assert "notes" not in results.columns
+    assert results["duration"].dtype == "float32"
+    assert results["avg_heart_rate"].dtype == "Int16"
+    assert results["calories"].dtype == "Int32"
+    assert results["calories"].isna().tolist() == [False, True]
+
+    notes = db_manager.get_exercise_notes(exercise_ids=results["id"][1:])
+    assert notes.tolist() == [DUMMY_NOTE]
+    assert notes.index.tolist() == results["id"][1:].tolist()
+
+
+def test_get_excercise_time_series_values_compact(any_db_manager):
+    data = DUMMY_DATA_ONE.astype(float)
+    data.loc[2, "heart_rate"] = None
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=data)
+
+    results = any_db_manager.get_excercise_time_series_values(exercise_id)
+
+    assert results["time"].dtype == "float64"
+    assert results["speed"].dtype == "float32"
+    assert results["heart_rate"].dtype == "Int16"
+    assert results["heart_rate"].isna().tolist() == [False, False, True, False, False]
+
+
 def test_get_excercise_time_series_values(db_manager):
     exercise_id = db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
 
     results = db_manager.get_excercise_time_series_values(exercise_id=exercise_id)
     results = results.drop(["id", "exercise_id"], axis=1)
+    results = _drop_unset_columns(results, DUMMY_DATA_ONE)
+    pd.testing.assert_frame_equal(results, DUMMY_DATA_ONE, check_dtype=False)
+
+
+def test_get_excercise_time_series_values_columns(db_manager):
+    exercise_id = db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+
+    results = db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id, column_names=["time", "speed", "time"]
+    )
+    pd.testing.assert_frame_equal(
+        results, DUMMY_DATA_ONE[["time", "speed"]], check_dtype=False
+    )
+
+
+@pytest.fixture()
+def compressed_db_manager(db_manager):
+    yield DBManager(db_manager.session, compressed=True)
+
+
+def test_compressed_exercise_roundtrip(compressed_db_manager):
+    exercise_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_TWO, data=DUMMY_DATA_TWO
+    )
+
+    # Nothing is stored as separate rows
+    assert pd.read_sql(TIMESERIES_TABLE_NAME, engine).empty
+
+    results = compressed_db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id
+    )
+    assert list(results["exercise_id"].unique()) == [exercise_id]
+    results = _drop_unset_columns(results.drop("exercise_id", axis=1), DUMMY_DATA_TWO)
+    pd.testing.assert_frame_equal(results, DUMMY_DATA_TWO, check_dtype=False)
+
+
+def test_compressed_exercise_select_columns(compressed_db_manager):
+    exercise_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE
+    )
+
+    results = compressed_db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id, column_names=["heart_rate", "time"]
+    )
+    pd.testing.assert_frame_equal(
+        results, DUMMY_DATA_ONE[["heart_rate", "time"]], check_dtype=False
+    )
+
+
+def test_compressed_add_timeseries_existing_values(compressed_db_manager):
+    first_batch = DUMMY_DATA_ONE[["time", "heart_rate"]][:3]
+    second_batch = DUMMY_DATA_ONE[["time", "speed", "altitude", "distance"]]
+
+    exercise_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_ONE, data=first_batch
+    )
+    compressed_db_manager.add_timeseries(exercise_id=exercise_id, data=second_batch)
+
+    # The compressed exercise is also found by a manager in the default mode
+    results = DBManager(compressed_db_manager.session).get_excercise_time_series_values(
+        exercise_id=exercise_id
+    )
+    expected = pd.merge(first_batch, second_batch, how="outer", on="time")
+    results = _drop_unset_columns(results.drop("exercise_id", axis=1), expected)
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+def test_compressed_add_timeseries_to_row_exercise(db_manager, compressed_db_manager):
+    exercise_id = db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE[:3])
+    compressed_db_manager.add_timeseries(
+        exercise_id=exercise_id, data=DUMMY_DATA_ONE[3:]
+    )
+
+    # The exercise keeps its row storage
+    assert pd.read_sql(CHUNKS_TABLE_NAME, engine).empty
+    results = compressed_db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id, column_names=list(DUMMY_DATA_ONE.columns)
+    )
     pd.testing.assert_frame_equal(results, DUMMY_DATA_ONE, check_dtype=False)
+
+
+@pytest.fixture(params=[False, True], ids=["rows", "compressed"])
+def any_db_manager(request, db_manager):
+    yield DBManager(db_manager.session, compressed=request.param)
+
+
+def test_get_excercise_time_series_window(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+
+    results = any_db_manager.get_excercise_time_series_window(
+        exercise_id=exercise_id,
+        start_time=1,
+        end_time=3,
+        column_names=["heart_rate", "speed"],
+    )
+    expected = DUMMY_DATA_ONE[["heart_rate", "speed"]][1:4].reset_index(drop=True)
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+    results = any_db_manager.get_excercise_time_series_window(
+        exercise_id=exercise_id, start_time=3, column_names="time"
+    )
+    assert list(results["time"]) == [3, 4]
+
+
+def test_get_excercise_time_series_all_columns(db_manager, compressed_db_manager):
+    row_id = db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+    compressed_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_TWO, data=DUMMY_DATA_ONE
+    )
+
+    rows = db_manager.get_excercise_time_series_values(row_id)
+    compressed = compressed_db_manager.get_excercise_time_series_values(compressed_id)
+
+    # Both storage modes give the same columns, the compressed samples have no id
+    assert list(rows.columns) == list(compressed.columns)
+    assert list(rows.dtypes) == list(compressed.dtypes)
+    assert rows["id"].notna().all()
+    assert compressed["id"].isna().all()
+
+
+def test_get_excercise_time_series_page(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+
+    first_page = any_db_manager.get_excercise_time_series_page(
+        exercise_id=exercise_id, limit=2, column_names=["time", "speed"]
+    )
+    second_page = any_db_manager.get_excercise_time_series_page(
+        exercise_id=exercise_id,
+        limit=2,
+        after_time=first_page["time"].iloc[-1],
+        column_names=["time", "speed"],
+    )
+
+    assert list(first_page["time"]) == [0, 1]
+    assert list(second_page["time"]) == [2, 3]
+    assert list(second_page["speed"]) == [4.0, 3.5]
+
+
+def test_compressed_time_series_page_across_chunks(compressed_db_manager):
+    time = pd.Series(range(3 * CHUNK_SIZE), dtype=float)
+    exercise_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_ONE, data=pd.DataFrame({"time": time, "speed": time})
+    )
+
+    # Starts in the middle of the first chunk and ends in the last one
+    for limit in (CHUNK_SIZE, CHUNK_SIZE + 1, 2 * CHUNK_SIZE):
+        page = compressed_db_manager.get_excercise_time_series_page(
+            exercise_id=exercise_id,
+            limit=limit,
+            after_time=CHUNK_SIZE // 2 - 1,
+            column_names=["time"],
+        )
+        assert list(page["time"]) == list(time[CHUNK_SIZE // 2 :][:limit])
+
+
+def test_iter_excercise_time_series(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+
+    chunks = list(
+        any_db_manager.iter_excercise_time_series(
+            exercise_id=exercise_id, chunk_size=2, start_time=1, column_names="speed"
+        )
+    )
+
+    assert [list(chunk.columns) for chunk in chunks] == [["speed"]] * 2
+    assert [list(chunk["speed"]) for chunk in chunks] == [[4.5, 4.0], [3.5, 3.0]]
+
+
+def test_failed_add_exercise_leaves_nothing(any_db_manager):
+    data = DUMMY_DATA_ONE.assign(unknown_column=1)
+
+    with pytest.raises(pd.errors.DatabaseError):
+        any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=data)
+
+    assert pd.read_sql(OVERVIEW_TABLE_NAME, engine).empty
+    assert pd.read_sql(TIMESERIES_TABLE_NAME, engine).empty
+    assert pd.read_sql(CHUNKS_TABLE_NAME, engine).empty
+
+
+def test_compressed_add_timeseries_unknown_column(compressed_db_manager):
+    exercise_id = compressed_db_manager.add_exercise(
+        meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE
+    )
+    chunks = pd.read_sql(CHUNKS_TABLE_NAME, engine)
+
+    with pytest.raises(pd.errors.DatabaseError):
+        compressed_db_manager.add_timeseries(
+            exercise_id, DUMMY_DATA_ONE[["time"]].assign(cadence=80)
+        )
+
+    pd.testing.assert_frame_equal(pd.read_sql(CHUNKS_TABLE_NAME, engine), chunks)
+
+
+def test_sync_exercise_new(any_db_manager):
+    exercise_id = any_db_manager.sync_exercise(
+        meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE, file_hash="abc"
+    )
+
+    assert any_db_manager.get_exercise_id_by_file_hash("abc") == exercise_id
+    assert any_db_manager.get_exercise_id_by_file_hash("def") is None
+    results = any_db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id, column_names=list(DUMMY_DATA_ONE.columns)
+    )
+    pd.testing.assert_frame_equal(results, DUMMY_DATA_ONE, check_dtype=False)
+
+
+def test_sync_exercise_known_file_is_skipped(db_manager):
+    exercise_id = db_manager.sync_exercise(
+        meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE, file_hash="abc"
+    )
+
+    # The data is not looked at when the file is known
+    assert (
+        db_manager.sync_exercise(meta=DUMMY_META_ONE, data=None, file_hash="abc")
+        == exercise_id
+    )
+
+
+def test_sync_exercise_unchanged_series(db_manager):
+    exercise_id = db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+    row_ids = db_manager.get_excercise_time_series_values(exercise_id)["id"]
+
+    # Same content, other row and column order
+    data = DUMMY_DATA_ONE[::-1][["speed", "time", "distance", "heart_rate", "altitude"]]
+    assert (
+        db_manager.sync_exercise(meta=DUMMY_META_ONE, data=data, file_hash="abc")
+        == exercise_id
+    )
+
+    # Nothing has been rewritten
+    results = db_manager.get_excercise_time_series_values(exercise_id)
+    pd.testing.assert_series_equal(results["id"], row_ids)
+    assert db_manager.get_exercise_id_by_file_hash("abc") == exercise_id
+
+    # Syncing without a file hash keeps the recorded one
+    db_manager.sync_exercise(meta=DUMMY_META_ONE, data=data)
+    assert db_manager.get_exercise_id_by_file_hash("abc") == exercise_id
+
+
+def test_sync_exercise_unchanged_series_updates_meta(db_manager):
+    exercise_id = db_manager.sync_exercise(
+        meta=dict(DUMMY_META_ONE, calories=100), data=DUMMY_DATA_ONE, file_hash="a"
+    )
+    version = db_manager.get_data_version()
+
+    # A new export of the same series with other metadata
+    db_manager.sync_exercise(
+        meta=dict(DUMMY_META_ONE, calories=200), data=DUMMY_DATA_ONE, file_hash="b"
+    )
+
+    overview = db_manager.get_exercise_overview().set_index("id")
+    assert overview.loc[exercise_id, "calories"] == 200
+    assert db_manager.get_exercise_id_by_file_hash("b") == exercise_id
+    assert db_manager.get_data_version() == version + 1
+
+    # Nothing changed, the data version is kept
+    db_manager.sync_exercise(
+        meta=dict(DUMMY_META_ONE, calories=200), data=DUMMY_DATA_ONE
+    )
+    assert db_manager.get_data_version() == version + 1
+
+
+def test_sync_exercise_changed_series(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_DATA_ONE)
+
+    data = DUMMY_DATA_ONE.copy()
+    data.loc[0, "heart_rate"] = 100
+    data = data[1:]
+    meta = dict(DUMMY_META_ONE, notes="Updated")
+
+    assert any_db_manager.sync_exercise(meta=meta, data=data) == exercise_id
+
+    results = any_db_manager.get_excercise_time_series_values(
+        exercise_id=exercise_id, column_names=list(data.columns)
+    )
+    pd.testing.assert_frame_equal(
+        results, data.reset_index(drop=True), check_dtype=False
+    )
+    assert list(any_db_manager.get_exercise_notes()) == ["Updated"]
+
+
+def test_get_exercises_in_bounding_box(any_db_manager):
+    # Out and back along a straight line, passing the box twice
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_TRACK)
+    any_db_manager.add_exercise(meta=DUMMY_META_TWO, data=DUMMY_DATA_TWO)
+
+    results = any_db_manager.get_exercises_in_bounding_box(60.0195, 10.0, 60.0405, 10.1)
+
+    expected = pd.DataFrame(
+        {
+            "exercise_id": [exercise_id, exercise_id],
+            "start_time": [2.0, 6.0],
+            "end_time": [4.0, 8.0],
+        }
+    )
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+    # Leaving the box without leaving its grid cell also breaks the pass
+    exercise_id = any_db_manager.add_exercise(
+        meta=dict(DUMMY_META_ONE, timestamp=datetime.datetime(2000, 1, 3)),
+        data=pd.DataFrame(
+            {
+                "time": [0, 1, 2, 3, 4],
+                "latitude": [60.0012, 60.0012, 60.0018, 60.0012, 60.0012],
+                "longitude": [10.0012] * 5,
+            }
+        ),
+    )
+
+    results = any_db_manager.get_exercises_in_bounding_box(
+        60.0010, 10.0010, 60.0014, 10.0014
+    )
+
+    expected = pd.DataFrame(
+        {
+            "exercise_id": [exercise_id, exercise_id],
+            "start_time": [0.0, 3.0],
+            "end_time": [1.0, 4.0],
+        }
+    )
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+def test_get_exercises_in_bounding_box_no_match(any_db_manager):
+    any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_TRACK)
+
+    results = any_db_manager.get_exercises_in_bounding_box(0.0, 0.0, 1.0, 1.0)
+
+    assert results.empty
+
+
+def test_add_timeseries_updates_grid_index(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(
+        meta=DUMMY_META_ONE, data=DUMMY_TRACK.drop(["latitude", "longitude"], axis=1)
+    )
+    assert any_db_manager.get_exercises_in_bounding_box(60.0, 10.0, 60.1, 10.1).empty
+
+    any_db_manager.add_timeseries(exercise_id=exercise_id, data=DUMMY_TRACK)
+
+    results = any_db_manager.get_exercises_in_bounding_box(60.0, 10.0, 60.1, 10.1)
+    assert list(results["start_time"]) == [0.0]
+    assert list(results["end_time"]) == [10.0]
+
+
+def test_get_segment_passes(any_db_manager):
+    exercise_id = any_db_manager.add_exercise(meta=DUMMY_META_ONE, data=DUMMY_TRACK)
+
+    # Only the outbound direction goes from start to end
+    results = any_db_manager.get_segment_passes(
+        start=(60.01, 10.05), end=(60.04, 10.05), radius=0.001
+    )
+
+    expected = pd.DataFrame(
+        {"exercise_id": [exercise_id], "start_time": [1.0], "end_time": [4.0]}
+    )
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+    results = any_db_manager.get_segment_passes(
+        start=(60.04, 10.05), end=(60.01, 10.05), radius=0.001
+    )
+    assert list(results["start_time"]) == [6.0]
+    assert list(results["end_time"]) == [9.0]
+
+
+def test_data_version(db_manager):
+    assert db_manager.get_data_version() == 0
+
+    exercise_id = db_manager.add_exercise(meta=DUMMY_META_ONE)
+    assert db_manager.get_data_version() == 1
+
+    db_manager.add_timeseries(exercise_id, DUMMY_DATA_ONE)
+    assert db_manager.get_data_version() == 2
+
+    db_manager.get_exercise_overview()
+    assert db_manager.get_data_version() == 2
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.compression import (
+    decode_column,
+    encode_column,
+    iter_chunks,
+    varint_decode,
+    varint_encode,
+    zigzag_decode,
+    zigzag_encode,
+)
+
+
+def test_zigzag_small_magnitudes_give_small_codes():
+    values = np.array([0, -1, 1, -2, 2])
+
+    np.testing.assert_array_equal(zigzag_encode(values), [0, 1, 2, 3, 4])
+    np.testing.assert_array_equal(zigzag_decode(zigzag_encode(values)), values)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [[0], [127], [128], [300, 1, 16384], [2**63 - 1, 0, 2**64 - 1]],
+)
+def test_varint_roundtrip(values):
+    values = np.array(values, dtype=np.uint64)
+
+    np.testing.assert_array_equal(varint_decode(varint_encode(values)), values)
+
+
+def test_varint_uses_one_byte_for_small_values():
+    assert len(varint_encode(np.arange(128, dtype=np.uint64))) == 128
+    assert len(varint_encode(np.array([128], dtype=np.uint64))) == 2
+
+
+def test_encode_column_roundtrip():
+    values = np.array([60.123, 60.125, 60.121, -3.5, 0.0])
+
+    data, null_mask = encode_column(values, scale=1000)
+
+    assert null_mask is None
+    np.testing.assert_allclose(decode_column(data, null_mask, 5, scale=1000), values)
+
+
+def test_encode_column_with_missing_values():
+    values = np.array([np.nan, 120, 121, np.nan, np.nan, 125, 124, 123, 122, np.nan])
+
+    data, null_mask = encode_column(values, scale=1)
+
+    assert null_mask is not None
+    decoded = decode_column(data, null_mask, len(values), scale=1)
+    np.testing.assert_array_equal(decoded, values)
+
+
+def test_iter_chunks():
+    data = pd.DataFrame({"time": range(10)})
+
+    chunks = list(iter_chunks(data, chunk_size=4))
+
+    assert [chunk for chunk, _ in chunks] == [0, 1, 2]
+    assert [len(chunk_data) for _, chunk_data in chunks] == [4, 4, 2]
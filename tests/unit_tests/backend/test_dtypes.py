@@ -0,0 +1,38 @@
+import pandas as pd
+
+from exercise_plotter.backend.database_manager import Exercises
+from exercise_plotter.backend.dtypes import column_dtypes, compact_frame, memory_report
+
+
+def test_column_dtypes():
+    dtypes = column_dtypes(Exercises.__table__)
+
+    assert dtypes["heart_rate"] == "Int16"
+    assert dtypes["speed"] == "float32"
+    assert "time" not in dtypes
+
+
+def test_compact_frame():
+    frame = pd.DataFrame(
+        {"time": [0.0, 1.0], "heart_rate": [120.0, None], "speed": [1.5, 2.5]}
+    )
+
+    result = compact_frame(frame, Exercises.__table__)
+
+    assert result["time"].dtype == "float64"
+    assert result["heart_rate"].dtype == "Int16"
+    assert result["heart_rate"].isna().tolist() == [False, True]
+    assert result["speed"].tolist() == [1.5, 2.5]
+    assert result["speed"].dtype == "float32"
+
+
+def test_memory_report():
+    frame = pd.DataFrame({"time": [0.0, 1.0], "speed": [1.5, 2.5]})
+    compact = compact_frame(frame.copy(), Exercises.__table__)
+
+    report = memory_report({"full": frame, "compact": compact, "empty": frame[:0]})
+
+    assert report.index.tolist() == ["full", "compact", "empty"]
+    assert report.loc["full", "rows"] == 2
+    assert report.loc["compact", "bytes"] < report.loc["full", "bytes"]
+    assert pd.isna(report.loc["empty", "bytes_per_row"])
@@ -0,0 +1,120 @@
+import io
+
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.export import (
+    export_exercises,
+    iter_export,
+    main,
+    select_exercises,
+)
+
+# pylint: disable=redefined-outer-name
+
+DUMMY_DATA = pd.DataFrame(
+    {"time": [0, 1, 2, 3, 4], "heart_rate": [120, 121, 122, 123, 124]}
+)
+
+
+@pytest.fixture()
+def db_manager(add_exercises):
+    return add_exercises([5.0, 10.0, 20.0], lambda day: DUMMY_DATA + day)
+
+
+def test_select_exercises():
+    overview = pd.DataFrame({"id": [1, 2, 3], "distance": [5.0, 10.0, 20.0]})
+
+    assert select_exercises(overview) == [1, 2, 3]
+    assert select_exercises(overview, {"distance": (6, 20)}) == [2, 3]
+
+
+def test_export_csv(db_manager):
+    output = io.BytesIO()
+
+    exercise_ids = export_exercises(
+        db_manager,
+        output,
+        "csv",
+        filters={"distance": (6, 20)},
+        column_names=["time", "heart_rate"],
+        chunk_size=2,
+    )
+
+    result = pd.read_csv(io.BytesIO(output.getvalue()))
+    expected = pd.concat(
+        [
+            (DUMMY_DATA + day).assign(exercise_id=e_id)
+            for day, e_id in zip([2, 3], exercise_ids)
+        ]
+    )[["exercise_id", "time", "heart_rate"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_export_parquet_row_groups(db_manager):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    output = io.BytesIO()
+
+    export_exercises(db_manager, output, "parquet", chunk_size=2)
+
+    parquet_file = pyarrow_parquet.ParquetFile(io.BytesIO(output.getvalue()))
+    # Every exercise has 5 samples, read 2 at a time
+    assert parquet_file.num_row_groups == 9
+    result = parquet_file.read().to_pandas()
+    assert len(result) == 15
+    assert list(result["exercise_id"].unique()) == [1, 2, 3]
+
+
+def test_export_unknown_format():
+    with pytest.raises(ValueError):
+        iter_export(iter([]), "xlsx")
+
+
+def test_export_nothing_csv(db_manager):
+    output = io.BytesIO()
+
+    exercise_ids = export_exercises(
+        db_manager,
+        output,
+        "csv",
+        filters={"distance": (100, 200)},
+        column_names=["time", "heart_rate"],
+    )
+
+    assert exercise_ids == []
+    assert output.getvalue() == b"exercise_id,time,heart_rate\n"
+
+
+def test_export_nothing_parquet(db_manager):
+    pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+    output = io.BytesIO()
+
+    export_exercises(
+        db_manager,
+        output,
+        "parquet",
+        filters={"distance": (100, 200)},
+        column_names=["time", "heart_rate"],
+    )
+
+    table = pyarrow_parquet.read_table(io.BytesIO(output.getvalue()))
+    assert table.num_rows == 0
+    assert table.schema.names == ["exercise_id", "time", "heart_rate"]
+    assert str(table.schema.field("time").type) == "double"
+
+
+def test_main_unknown_filter_column(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(
+            [
+                str(tmp_path / "exercises.db"),
+                str(tmp_path / "exercises.csv"),
+                "--filter",
+                "notes",
+                "0",
+                "1",
+            ]
+        )
+
+    assert "Unable to filter on notes" in capsys.readouterr().err
+    assert not (tmp_path / "exercises.csv").exists()
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from exercise_plotter.backend.fingerprint import hash_file, hash_timeseries
+
+DUMMY_DATA = pd.DataFrame(
+    {"time": [0, 1, 2], "heart_rate": [120, 121, 122], "speed": [3.5, 4.0, 4.5]}
+)
+
+
+def test_hash_file(tmp_path):
+    path = tmp_path / "exercise.csv"
+    path.write_bytes(b"time,speed\n0,1.5\n")
+
+    other = tmp_path / "other.csv"
+    other.write_bytes(b"time,speed\n0,1.6\n")
+
+    assert hash_file(str(path)) == hash_file(str(path))
+    assert hash_file(str(path)) != hash_file(str(other))
+
+
+def test_hash_timeseries_ignores_order_and_dtype():
+    reordered = DUMMY_DATA[::-1][["speed", "heart_rate", "time"]]
+    as_float = DUMMY_DATA.astype(float)
+    with_empty_column = DUMMY_DATA.assign(altitude=np.nan)
+
+    expected = hash_timeseries(DUMMY_DATA)
+    assert hash_timeseries(reordered) == expected
+    assert hash_timeseries(as_float) == expected
+    assert hash_timeseries(with_empty_column) == expected
+
+
+def test_hash_timeseries_changes_with_content():
+    changed = DUMMY_DATA.copy()
+    changed.loc[1, "speed"] = 4.1
+
+    assert hash_timeseries(changed) != hash_timeseries(DUMMY_DATA)
+    assert hash_timeseries(DUMMY_DATA.drop("speed", axis=1)) != hash_timeseries(
+        DUMMY_DATA
+    )
@@ -0,0 +1,120 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.database_manager import DBManager, ExercisesOverview
+
+# pylint: disable=redefined-outer-name
+
+DUMMY_DATA = pd.DataFrame(
+    {
+        "time": np.arange(0.0, 30.0, 2.0),
+        "heart_rate": np.arange(120, 135),
+        "speed": np.linspace(3.0, 4.4, 15),
+    }
+)
+
+
+@pytest.fixture()
+def db_manager(add_exercises):
+    return add_exercises(
+        [5.0, 10.0, 20.0],
+        lambda day: DUMMY_DATA.assign(heart_rate=DUMMY_DATA["heart_rate"] + day),
+    )
+
+
+def test_query_is_lazy(db_manager):
+    query = db_manager.exercises().select("speed")
+
+    # Adding an exercise after building the query is reflected in the result
+    db_manager.add_exercise(
+        meta={"timestamp": datetime.datetime(2000, 1, 4)}, data=DUMMY_DATA
+    )
+
+    assert query.to_frame()["exercise_id"].nunique() == 4
+
+
+def test_query_all(db_manager):
+    results = db_manager.exercises().to_frame()
+
+    assert len(results) == 3 * len(DUMMY_DATA)
+    assert {"exercise_id", "time", "heart_rate", "speed", "distance"} <= set(
+        results.columns
+    )
+
+
+def test_query_where_between_select(db_manager):
+    query = (
+        db_manager.exercises()
+        .where(ExercisesOverview.distance > 6)
+        .between(4, 8)
+        .select("heart_rate", "time")
+    )
+
+    results = query.to_frame()
+
+    assert list(results.columns) == ["exercise_id", "time", "heart_rate"]
+    assert list(results["exercise_id"]) == [2, 2, 2, 3, 3, 3]
+    assert list(results["time"]) == [4, 6, 8] * 2
+    assert list(results["heart_rate"]) == [124, 125, 126, 125, 126, 127]
+    assert results["heart_rate"].dtype == "Int16"
+
+
+def test_query_where_ranges(db_manager):
+    query = db_manager.exercises().where(distance=(None, 10)).select("speed")
+
+    assert list(query.to_frame()["exercise_id"].unique()) == [1, 2]
+
+
+def test_query_resample(db_manager):
+    query = (
+        db_manager.exercises()
+        .where(distance=(20, 20))
+        .select("heart_rate", "speed")
+        .resample("10s")
+    )
+
+    results = query.to_frame()
+
+    # Single statement, aggregated in the database
+    assert "GROUP BY" in str(query)
+    assert list(results["time"]) == [0, 10, 20]
+    np.testing.assert_allclose(results["heart_rate"], [125, 130, 135])
+
+    maximum = query.resample(10, aggregate="max").to_numpy()
+    np.testing.assert_allclose(maximum[:, 2], [127, 132, 137])
+
+
+def test_query_resample_unknown_aggregate(db_manager):
+    with pytest.raises(ValueError):
+        db_manager.exercises().resample("10s", aggregate="median")
+
+
+@pytest.mark.parametrize("interval", [None, 10])
+def test_query_includes_compressed_exercises(db_manager, interval):
+    compressed_id = DBManager(db_manager.session, compressed=True).add_exercise(
+        meta={"timestamp": datetime.datetime(2000, 1, 4), "distance": 20.0},
+        data=DUMMY_DATA.assign(heart_rate=DUMMY_DATA["heart_rate"] + 3),
+    )
+    query = (
+        db_manager.exercises()
+        .where(distance=(20, 20))
+        .between(4, 24)
+        .select("heart_rate", "speed")
+    )
+    if interval is not None:
+        query = query.resample(interval, aggregate="max")
+
+    results = query.to_frame()
+
+    # The compressed exercise has the same samples as exercise 3
+    assert list(results["exercise_id"].unique()) == [3, compressed_id]
+    row_results, compressed_results = [
+        data.drop("exercise_id", axis=1).reset_index(drop=True)
+        for _, data in results.groupby("exercise_id")
+    ]
+    pd.testing.assert_frame_equal(
+        compressed_results, row_results, check_dtype=False, atol=1e-6
+    )
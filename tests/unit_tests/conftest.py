@@ -0,0 +1,96 @@
+import datetime
+import importlib
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import exercise_plotter.frontend
+from exercise_plotter import Session
+from exercise_plotter.backend.database_manager import Base, DBManager
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def engine(monkeypatch):
+    """An empty in memory database. It is bound to the global Session for the
+    duration of the test, as the code under test (e.g. the http endpoints)
+    opens its own sessions.
+    """
+    # All connections, also those of requests, share the one in memory database
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setitem(Session.kw, "bind", engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture()
+def session(engine):
+    session = Session(bind=engine)
+    yield session
+    session.close()
+
+
+@pytest.fixture()
+def add_exercises(session):
+    """Add one exercise per distance, on consecutive days starting 2000-01-01.
+
+    Arguments:
+        distances {List[float]} -- The distances of the exercises
+        data {Union[pd.DataFrame, Callable]} -- The time series of every
+        exercise, or a function of the day giving it
+
+    Returns:
+        DBManager -- The manager the exercises were added with
+    """
+
+    def add(distances, data):
+        db_man = DBManager(session)
+        for day, distance in enumerate(distances, start=1):
+            db_man.add_exercise(
+                meta={
+                    "timestamp": datetime.datetime(2000, 1, day),
+                    "distance": distance,
+                },
+                data=data(day) if callable(data) else data,
+            )
+        return db_man
+
+    return add
+
+
+@pytest.fixture()
+def frontend_module(monkeypatch, engine):
+    """Import a frontend module. Some of them configure the global Session
+    with the example database when imported, it is bound to the test
+    database again afterwards.
+    """
+
+    def import_module(name):
+        with monkeypatch.context() as patch:
+            patch.chdir(os.path.dirname(exercise_plotter.frontend.__file__))
+            patch.setitem(Session.kw, "bind", engine)
+            return importlib.import_module("exercise_plotter.frontend." + name)
+
+    return import_module
+
+
+@pytest.fixture()
+def client(engine):  # pylint: disable=unused-argument
+    """Test client of the Flask server of the app"""
+    # pylint: disable=import-outside-toplevel
+    import dash_html_components as html
+    from exercise_plotter.frontend.app import app, server
+
+    # Dash refuses to serve any request before a layout is set
+    if app.layout is None:
+        app.layout = html.Div()
+
+    return server.test_client()
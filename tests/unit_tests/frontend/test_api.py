@@ -0,0 +1,119 @@
+import datetime
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.database_manager import DBManager
+from exercise_plotter.frontend.api import ARROW_MIME_TYPE
+
+# pylint: disable=redefined-outer-name
+
+DUMMY_DATA = pd.DataFrame(
+    {
+        "time": np.arange(0.0, 300.0, 2.0),
+        "heart_rate": np.arange(120, 270),
+        "speed": np.linspace(3.0, 4.4, 150),
+    }
+)
+
+
+@pytest.fixture(autouse=True)
+def db_manager(add_exercises):
+    return add_exercises([5.0, 10.0], DUMMY_DATA)
+
+
+def _json_frame(response):
+    return pd.read_json(io.StringIO(response.get_data(as_text=True)), orient="split")
+
+
+def test_overview(client):
+    response = client.get("/api/overview")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert _json_frame(response)["distance"].tolist() == [5.0, 10.0]
+
+
+def test_series(client):
+    response = client.get("/api/exercises/1/series?columns=time,speed&start=2&end=6")
+
+    assert response.status_code == 200
+    result = _json_frame(response)
+    assert list(result.columns) == ["time", "speed"]
+    assert result["time"].tolist() == [2.0, 4.0, 6.0]
+
+
+def test_query(client):
+    response = client.get("/api/query?distance=8,&columns=heart_rate&resample=100s")
+
+    assert response.status_code == 200
+    result = _json_frame(response)
+    assert result["exercise_id"].unique().tolist() == [2]
+    assert result["time"].tolist() == [0.0, 100.0, 200.0]
+
+
+def test_query_includes_compressed_exercises(client, db_manager):
+    exercise_id = DBManager(db_manager.session, compressed=True).add_exercise(
+        meta={"timestamp": datetime.datetime(2000, 1, 3), "distance": 20.0},
+        data=DUMMY_DATA,
+    )
+
+    response = client.get("/api/query?distance=8,&columns=speed")
+
+    result = _json_frame(response)
+    assert result["exercise_id"].unique().tolist() == [2, exercise_id]
+
+
+def test_invalid_requests(client):
+    assert client.get("/api/query?unknown=1,2").status_code == 400
+    assert client.get("/api/query?distance=1").status_code == 400
+    assert client.get("/api/exercises/1/series?columns=unknown").status_code == 400
+    assert client.get("/api/overview?format=xml").status_code == 406
+
+
+def test_not_modified_until_the_data_changes(client, db_manager):
+    response = client.get("/api/overview")
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/overview", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+    # Another resource or format does not match
+    assert client.get("/api/overview?format=arrow").headers["ETag"] != etag
+
+    db_manager.add_exercise(meta={"timestamp": datetime.datetime(2000, 1, 3)})
+
+    response = client.get("/api/overview", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(_json_frame(response)) == 3
+
+
+def test_gzip(client):
+    response = client.get(
+        "/api/exercises/1/series", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    result = pd.read_json(
+        io.StringIO(gzip.decompress(response.get_data()).decode()), orient="split"
+    )
+    assert len(result) == len(DUMMY_DATA)
+
+
+def test_arrow(client):
+    pyarrow_ipc = pytest.importorskip("pyarrow.ipc")
+    response = client.get(
+        "/api/exercises/1/series?columns=time,heart_rate",
+        headers={"Accept": ARROW_MIME_TYPE},
+    )
+
+    assert response.mimetype == ARROW_MIME_TYPE
+    table = pyarrow_ipc.open_stream(response.get_data()).read_all()
+    assert table.column_names == ["time", "heart_rate"]
+    assert table.num_rows == len(DUMMY_DATA)
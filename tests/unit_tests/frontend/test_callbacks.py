@@ -0,0 +1,34 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.backend.database_manager import DBManager
+
+# pylint: disable=redefined-outer-name
+
+DUMMY_DATA = pd.DataFrame(
+    {"time": np.arange(0.0, 10.0), "speed": np.linspace(3.0, 4.0, 10)}
+)
+
+
+@pytest.fixture()
+def callbacks(frontend_module):
+    return frontend_module("callbacks")
+
+
+def test_update_timeseriesplot_includes_compressed_exercises(callbacks, session):
+    for day, compressed in zip([1, 2], [False, True]):
+        DBManager(session, compressed=compressed).add_exercise(
+            meta={"timestamp": datetime.datetime(2000, 1, day)}, data=DUMMY_DATA
+        )
+
+    # No filters set, compressed speeds are stored with a precision of 1e-3
+    filters = [(None, None)] * len(callbacks._filter_options)
+    figure = callbacks.update_timeseriesplot("time", "speed", *filters)
+
+    assert len(figure["data"]) == 2
+    for trace in figure["data"]:
+        np.testing.assert_allclose(trace.x, DUMMY_DATA["time"])
+        np.testing.assert_allclose(trace.y, DUMMY_DATA["speed"], atol=1e-3)
@@ -0,0 +1,41 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exercise_plotter.frontend.downloads import download_url
+
+DUMMY_DATA = pd.DataFrame(
+    {"time": np.arange(0.0, 10.0), "speed": np.linspace(3.0, 4.0, 10)}
+)
+
+
+@pytest.fixture(autouse=True)
+def db_manager(add_exercises):
+    return add_exercises([5.0, 10.0], DUMMY_DATA)
+
+
+def test_download_csv(client):
+    response = client.get(download_url("csv", {"distance": (8, 12)}, ["speed"]))
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    result = pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+    assert list(result.columns) == ["exercise_id", "speed"]
+    assert result["exercise_id"].unique().tolist() == [2]
+    assert len(result) == len(DUMMY_DATA)
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["unknown=1,2", "distance=1", "distance=a,b", "notes=1,2", "columns=unknown"],
+)
+def test_download_invalid_request(client, query):
+    response = client.get("/download/csv?{}".format(query))
+
+    assert response.status_code == 400
+
+
+def test_download_unknown_format(client):
+    assert client.get("/download/xml").status_code == 404
@@ -0,0 +1,31 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture()
+def util(frontend_module):
+    return frontend_module("util")
+
+
+def test_columnar_data(util):
+    data = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2000-01-01 10:00", None]),
+            "speed": [3.5, np.nan],
+            "heart_rate": pd.array([120, None], dtype="Int16"),
+        }
+    )
+
+    columns = util.columnar_data(data)
+
+    assert columns == {
+        "timestamp": [str(pd.Timestamp("2000-01-01 10:00")), None],
+        "speed": [3.5, None],
+        "heart_rate": [120, None],
+    }
+    json.dumps(columns)